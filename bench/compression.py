@@ -0,0 +1,74 @@
+"""CPU cost versus bytes saved when compressing the Socket.IO traffic mix.
+
+Each event of the mix in wire_protocol.py is encoded as a JSON Socket.IO
+packet, then compressed the way each transport would: gzip for a polling
+response and raw deflate with a sync flush for a permessage-deflate frame.
+Only packets at or above the threshold are compressed.
+
+Usage: python bench/compression.py [iterations]
+"""
+import gzip
+import sys
+import time
+import zlib
+
+from socketio import packet
+
+from wire_protocol import EVENT_MIX
+
+THRESHOLDS = [0, 256, 512, 1024, 4096]
+
+
+def deflate_frame(data):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)[:-4]
+
+
+COMPRESSORS = {
+    "gzip (polling)": lambda data: gzip.compress(data, compresslevel=6),
+    "deflate (websocket)": deflate_frame,
+}
+
+
+def encoded_mix():
+    return [
+        (event, packet.Packet(packet.EVENT, data=[event, payload]).encode().encode("utf-8"), weight)
+        for event, payload, weight in EVENT_MIX
+    ]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    mix = encoded_mix()
+
+    print("packet sizes:")
+    for event, data, _ in mix:
+        print(f"  {event:<18} {len(data):>6} bytes")
+
+    for name, compress in COMPRESSORS.items():
+        print(f"\n{name}, {iterations} events")
+        print(f"{'threshold':>10} {'bytes':>12} {'saved':>8} {'cpu s':>8} {'us/KB saved':>12}")
+        raw_bytes = sum(len(data) * (iterations * weight // 100) for _, data, weight in mix)
+
+        for threshold in THRESHOLDS:
+            total_bytes = 0
+            cpu = 0.0
+            for _, data, weight in mix:
+                count = iterations * weight // 100
+                if len(data) < threshold:
+                    total_bytes += len(data) * count
+                    continue
+
+                start = time.perf_counter()
+                for _ in range(count):
+                    compressed = compress(data)
+                cpu += time.perf_counter() - start
+                total_bytes += len(compressed) * count
+
+            saved = raw_bytes - total_bytes
+            cost = cpu * 1e6 / (saved / 1024) if saved > 0 else float("inf")
+            print(f"{threshold:>10} {total_bytes:>12} {saved / raw_bytes:>8.1%} {cpu:>8.3f} {cost:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
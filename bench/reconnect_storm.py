@@ -0,0 +1,111 @@
+"""Simulate a post-deploy reconnect storm against the in-process server.
+
+Every client connects and registers at the same moment, honours the
+retry-after hints it gets back, and the run reports how many handshakes were
+refused and how many stats_update frames were delivered in total.
+
+Usage: python bench/reconnect_storm.py [clients]
+
+The admission settings of tictactoe/limits.py apply (ADMISSION_RATE, STORM_THRESHOLD, ...).
+Run with ADMISSION_CONTROL_ENABLED=0 and ~1000 clients for a baseline; the
+unshaped storm grows quadratically and 10k clients would not fit in memory.
+"""
+import heapq
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("SNAPSHOT_INTERVAL", "0")
+
+import logging  # noqa: E402
+
+import app  # noqa: E402
+from tictactoe import events, limits, rooms  # noqa: E402
+
+logging.getLogger("tictactoe").setLevel(logging.WARNING)
+
+# Record the retry-after the server hands out, since the test client drops
+# the data attached to a refused connection
+last_retry_after = [0]
+_admit_handshake = events.admit_handshake
+
+
+def recording_admit_handshake():
+    last_retry_after[0] = _admit_handshake()
+    return last_retry_after[0]
+
+
+events.admit_handshake = recording_admit_handshake
+
+
+def drain(clients):
+    frames = 0
+    for client in clients:
+        if client is None or not client.is_connected():
+            continue
+        frames += sum(1 for message in client.get_received() if message["name"] == "stats_update")
+    return frames
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    clients = [None] * count
+    registered = [False] * count
+    in_lobby = set()
+    queue = [(0.0, i) for i in range(count)]  # (due at, client index)
+    connect_refusals = 0
+    register_retries = 0
+    frames = 0
+    steps = 0
+
+    start = time.monotonic()
+    while queue:
+        due, i = heapq.heappop(queue)
+        delay = due - (time.monotonic() - start)
+        if delay > 0:
+            time.sleep(delay)
+
+        client = clients[i]
+        if client is None:
+            client = clients[i] = app.socketio.test_client(app.app)
+        elif not client.is_connected():
+            client.connect()
+
+        if not client.is_connected():
+            in_lobby.discard(i)
+            connect_refusals += 1
+            heapq.heappush(queue, (time.monotonic() - start + last_retry_after[0], i))
+            continue
+
+        if i not in in_lobby:
+            client.emit("join_lobby")
+            in_lobby.add(i)
+        client.emit("register_player", {"player_id": f"storm_{i}", "player_name": f"Storm {i}"})
+        if "storm_%d" % i in rooms.players:
+            registered[i] = True
+        else:
+            register_retries += 1
+            heapq.heappush(queue, (time.monotonic() - start + last_retry_after[0], i))
+
+        steps += 1
+        if steps % 500 == 0:
+            frames += drain(clients)
+            print(f"{sum(registered)}/{count} registered after {time.monotonic() - start:.1f}s")
+
+    elapsed = time.monotonic() - start
+    # Let the deferred stats broadcast go out once the storm is over
+    time.sleep(limits.STORM_COOLDOWN + 1.5)
+    frames += drain(clients)
+
+    print(f"clients:            {count}")
+    print(f"registered:         {sum(registered)} in {elapsed:.1f}s")
+    print(f"connect refusals:   {connect_refusals}")
+    print(f"register retries:   {register_retries}")
+    print(f"stats broadcasts:   {limits.admission_stats['stats_broadcasts']}")
+    print(f"stats suppressed:   {limits.admission_stats['stats_suppressed']}")
+    print(f"stats frames:       {frames} ({frames / count:.1f} per client)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Headless self-play through the game core, checking invariants on every step.
+
+Each worker process keeps one GameRoom per board variant and plays games
+back to back through GameRoom.make_move (the rules behind make_move events)
+and GameRoom.reset_game, with no sockets involved. Random games pick uniform
+legal moves. Adversarial games also fire an illegal action before every
+move (out of turn, occupied, off-board or non-integer cells) and now and
+then reset mid-game; each must be rejected without touching the state.
+
+After every step the room is checked for: move count equal to filled
+cells, X and O alternating, turns passing to the opponent, and a win being
+declared exactly when the new mark completes a line (found by an
+independent scan of the lines through it). Finished games are checked
+against a full check_winner scan and must refuse further moves. Doubles as a
+throughput benchmark for the game core. Exits non-zero on any violation.
+
+Usage: python bench/self_play.py [games per variant] [processes] [adversarial fraction]
+"""
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("SNAPSHOT_INTERVAL", "0")
+
+from tictactoe.rooms import BOARD_VARIANTS, GameRoom, check_winner  # noqa: E402
+
+CHUNK = 2000  # games per task; a failure is reported with its chunk seed
+MAX_FAILURES = 5  # per chunk
+PLAYERS = ("sim_x", "sim_o")
+
+
+class InvariantError(AssertionError):
+    pass
+
+
+def check(condition, message):
+    if not condition:
+        raise InvariantError(message)
+
+
+def completes_line(board, size, run, index):
+    """Whether the mark at index is part of run equal marks in a line"""
+    row, col = divmod(index, size)
+    target = board[index] * run
+    for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        line = []
+        for step in range(-run + 1, run):
+            r, c = row + d_row * step, col + d_col * step
+            if 0 <= r < size and 0 <= c < size:
+                line.append(board[r * size + c] or ".")
+        if target in "".join(line):
+            return True
+    return False
+
+
+def check_state(room, mover, before, index):
+    state = room.game_state
+    board = state["board"]
+    x, o = board.count("X"), board.count("O")
+    check(state["moves"] == x + o, f"move count {state['moves']} != {x + o} filled cells")
+    check(x - o in (0, 1), f"{x} X marks against {o} O marks")
+    check(before + 1 == state["moves"], "move count did not advance by one")
+
+    if completes_line(board, room.size, room.run, index):
+        check(state["winner"] == board[index], f"winning mark at {index} but winner is {state['winner']}")
+    elif x + o == len(board):
+        check(state["winner"] == "tie", f"full board but winner is {state['winner']}")
+    else:
+        check(state["winner"] is None, f"winner {state['winner']} declared without a line")
+
+    if state["winner"]:
+        check(not state["game_active"] and state["current_player"] is None, "game still live after a result")
+    else:
+        check(state["game_active"], "game ended without a result")
+        check(state["current_player"] == PLAYERS[PLAYERS.index(mover) ^ 1], "turn did not pass to the opponent")
+
+
+def check_finished(room):
+    state = room.game_state
+    scanned = check_winner(state["board"], room.size, room.run)
+    check(state["winner"] == (scanned or "tie"), f"winner {state['winner']} but board scan says {scanned}")
+    for player_id in PLAYERS:
+        expect_rejected(room, player_id, 0)
+
+
+def expect_rejected(room, player_id, index):
+    before = (list(room.game_state["board"]), dict(room.game_state, board=None))
+    try:
+        room.make_move(player_id, index)
+    except ValueError:
+        after = (room.game_state["board"], dict(room.game_state, board=None))
+        check(after == before, f"rejected move {player_id}@{index!r} changed the state")
+        return
+    raise InvariantError(f"illegal move {player_id}@{index!r} was accepted")
+
+
+def illegal_action(room, rng):
+    state = room.game_state
+    board = state["board"]
+    waiting = PLAYERS[PLAYERS.index(state["current_player"]) ^ 1]
+    kind = rng.randrange(4)
+    if kind == 0:
+        empty = [i for i, cell in enumerate(board) if cell is None]
+        expect_rejected(room, waiting, rng.choice(empty))
+    elif kind == 1 and state["moves"]:
+        filled = [i for i, cell in enumerate(board) if cell is not None]
+        expect_rejected(room, state["current_player"], rng.choice(filled))
+    elif kind == 2:
+        expect_rejected(room, state["current_player"], rng.choice((-1, len(board), len(board) * 2)))
+    else:
+        expect_rejected(room, state["current_player"], rng.choice((True, "0", 0.0, None)))
+
+
+def play_game(room, rng, adversarial):
+    """Play one game; returns (moves, seconds spent inside the game core)"""
+    core = time.perf_counter()
+    room.reset_game()
+    check(room.start_game(), "room did not start")
+    core = time.perf_counter() - core
+    check(room.game_state["moves"] == 0 and room.game_state["current_player"] == PLAYERS[0], "bad opening state")
+    cells = len(room.game_state["board"])
+    order = rng.sample(range(cells), cells)  # move order; popped from the end
+    moves = 0
+    while room.game_state["game_active"]:
+        if adversarial:
+            illegal_action(room, rng)
+            if rng.random() < 0.01:
+                room.reset_game()
+                check(room.game_state["moves"] == 0 and not room.game_state["game_active"], "reset left state")
+                check(room.start_game(), "room did not restart")
+                order = rng.sample(range(cells), cells)
+        state = room.game_state
+        mover = state["current_player"]
+        before = state["moves"]
+        index = order.pop()
+        start = time.perf_counter()
+        room.make_move(mover, index)
+        core += time.perf_counter() - start
+        moves += 1
+        check_state(room, mover, before, index)
+
+    check_finished(room)
+    return moves, core
+
+
+def run_chunk(args):
+    variant, seed, games, adversarial_fraction = args
+    rng = random.Random(seed)
+    room = GameRoom(f"sim-{variant}", variant)
+    for player_id in PLAYERS:
+        room.add_player(player_id, {"name": player_id, "sid": None})
+
+    moves = 0
+    core = 0.0
+    failures = []
+    start = time.perf_counter()
+    for game in range(games):
+        try:
+            played, seconds = play_game(room, rng, rng.random() < adversarial_fraction)
+            moves += played
+            core += seconds
+        except InvariantError as e:
+            failures.append(f"{variant} seed {seed} game {game}: {e} board={room.game_state['board']}")
+            if len(failures) >= MAX_FAILURES:
+                break
+    elapsed = time.perf_counter() - start
+    for player_id in PLAYERS:
+        room.remove_player(player_id)
+    return variant, games, moves, elapsed, core, failures
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    adversarial_fraction = float(sys.argv[3]) if len(sys.argv) > 3 else 0.5
+
+    tasks = []
+    for variant in BOARD_VARIANTS:
+        for seed in range(0, games, CHUNK):
+            tasks.append((variant, seed, min(CHUNK, games - seed), adversarial_fraction))
+
+    print(f"{games} games per variant, {processes} processes, {adversarial_fraction:.0%} adversarial")
+    print(f"{'variant':>12} {'games':>9} {'moves':>11} {'games/s':>10} {'core moves/s':>13}")
+    totals = {variant: [0, 0, 0.0, 0.0] for variant in BOARD_VARIANTS}
+    failures = []
+    wall = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        for variant, *counts, failed in pool.imap_unordered(run_chunk, tasks):
+            totals[variant] = [total + count for total, count in zip(totals[variant], counts)]
+            failures.extend(failed)
+    wall = time.perf_counter() - wall
+
+    # Per-variant rates are per process, with checks (games/s) and for the
+    # make_move/reset/start calls alone (core moves/s)
+    for variant, (played, moves, elapsed, core) in totals.items():
+        print(f"{variant:>12} {played:>9} {moves:>11} {played / elapsed:>10.0f} {moves / core:>13.0f}")
+    all_games = sum(total[0] for total in totals.values())
+    all_moves = sum(total[1] for total in totals.values())
+    print(f"{'all':>12} {all_games:>9} {all_moves:>11} {all_games / wall:>10.0f}  ({wall:.1f}s wall)")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Moves per second through the sharded launcher at several worker counts.
+
+For each worker count the launcher is started with rate limits and admission
+control off, then client processes each play PAIRS games in parallel
+threads for DURATION seconds. Every pair registers through the router,
+creates a room on its lobby shard, has the second player connect by room id,
+and plays five-move games back to back. The clients speak raw Engine.IO over
+simple-websocket, so no extra client packages are needed.
+
+Usage: python bench/shard_scaling.py [duration] [client processes] [pairs per process]
+"""
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from urllib.parse import urlencode
+
+import simple_websocket
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PORT = 5600
+GAME = [("X", 0), ("O", 3), ("X", 1), ("O", 4), ("X", 2)]  # X wins on the fifth move
+
+
+class Client:
+    def __init__(self, port, **query):
+        self.ws = simple_websocket.Client(
+            f"ws://127.0.0.1:{port}/socket.io/?EIO=4&transport=websocket&{urlencode(query)}"
+        )
+        self.ws.receive()  # Engine.IO open packet
+        self.ws.send("40")
+        self.wait_for_packet("40")
+
+    def wait_for_packet(self, prefix):
+        while True:
+            message = self.ws.receive()
+            if message == "2":
+                self.ws.send("3")
+            elif message.startswith(prefix):
+                return message
+
+    def emit(self, event, data):
+        self.ws.send("42" + json.dumps([event, data]))
+
+    def wait(self, event, match=lambda data: True):
+        while True:
+            name, data = json.loads(self.wait_for_packet("42")[2:])[:2]
+            if name == event and match(data):
+                return data
+            if name == "error":
+                raise RuntimeError(data["message"])
+
+
+def play_pair(port, deadline, results):
+    ids = {symbol: f"bench_{uuid.uuid4().hex[:8]}" for symbol in "XO"}
+    x = Client(port, player=ids["X"])
+    x.emit("register_player", {"player_id": ids["X"], "player_name": "X"})
+    x.wait("player_registered")
+    x.emit("create_room", {"player_id": ids["X"], "room_name": "bench"})
+    room_id = x.wait("room_created")["room_id"]
+
+    o = Client(port, room=room_id, player=ids["O"])
+    o.emit("register_player", {"player_id": ids["O"], "player_name": "O"})
+    o.wait("player_registered")
+    o.emit("join_room", {"player_id": ids["O"], "room_id": room_id})
+    x.wait("game_started")
+
+    clients = {"X": x, "O": o}
+    moves = 0
+    while time.monotonic() < deadline:
+        for count, (symbol, index) in enumerate(GAME, 1):
+            clients[symbol].emit("make_move", {"player_id": ids[symbol], "room_id": room_id, "index": index})
+            clients[symbol].wait("move_made", lambda data: data["moves"] == count)
+            moves += 1
+        x.emit("reset_game", {"player_id": ids["X"], "room_id": room_id})
+        x.wait("game_reset")
+        x.emit("start_game", {"player_id": ids["X"], "room_id": room_id})
+        x.wait("game_started")
+    results.append(moves)
+
+
+def client_process(args):
+    port, pairs, duration = args
+    deadline = time.monotonic() + duration
+    results = []
+    threads = [threading.Thread(target=play_pair, args=(port, deadline, results)) for _ in range(pairs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(results)
+
+
+def wait_until_up(port, workers, timeout=30):
+    deadline = time.monotonic() + timeout
+    up = set()
+    while len(up) < workers:
+        if time.monotonic() > deadline:
+            raise RuntimeError("workers did not come up")
+        for shard in range(workers):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port + 1 + shard}/health", timeout=1)
+                up.add(shard)
+            except OSError:
+                time.sleep(0.2)
+
+
+def measure(workers, duration, processes, pairs):
+    env = dict(
+        os.environ, RATE_LIMIT_ENABLED="0", ADMISSION_CONTROL_ENABLED="0",
+        SNAPSHOT_INTERVAL="0", SNAPSHOT_PATH=os.devnull + ".missing", DRAIN_TIMEOUT="0"
+    )
+    launcher = subprocess.Popen(
+        [sys.executable, "-m", "tictactoe.launcher", "--workers", str(workers), "--port", str(PORT)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_up(PORT, workers)
+        with multiprocessing.Pool(processes) as pool:
+            moves = sum(pool.map(client_process, [(PORT, pairs, duration)] * processes))
+    finally:
+        launcher.send_signal(signal.SIGTERM)
+        launcher.wait()
+    return moves / duration
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    pairs = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+
+    print(f"{cores} cores, {processes} client processes x {pairs} games, {duration:.0f}s each")
+    print(f"{'workers':>8} {'moves/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in counts:
+        rate = measure(workers, duration, processes, pairs)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>10.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
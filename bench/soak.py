@@ -0,0 +1,243 @@
+"""Soak test: mixed traffic in phases, checking that every registry drains.
+
+Runs the server in-process and drives simulated clients through a weighted
+mix of connect, create, join, start, move, reset, leave (the leave_room
+event, socket kept open), reconnect and abrupt disconnect. After every
+load phase all clients drop, held seats are expired, and the run fails if
+game_rooms, players, waiting_players, their indexes, rate buckets or socket
+rooms are not back to their baseline, or if memory traced by tracemalloc
+has grown past the tolerance since the first (warm-up) quiesce.
+
+Usage: python bench/soak.py [--duration SECONDS] [--phase SECONDS] [--clients N]
+                            [--mix connect=5,create=3,...] [--tolerance KB]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("SNAPSHOT_INTERVAL", "0")
+os.environ.setdefault("SNAPSHOT_PATH", os.devnull + ".missing")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+os.environ.setdefault("ADMISSION_CONTROL_ENABLED", "0")
+os.environ.setdefault("RECONNECT_GRACE_PERIOD", "1")
+
+import logging  # noqa: E402
+
+from flask_socketio.test_client import SocketIOTestClient  # noqa: E402
+
+import app  # noqa: E402
+from tictactoe import limits, lobby, rooms, sessions, socketio  # noqa: E402
+
+logging.getLogger("tictactoe").setLevel(logging.WARNING)
+
+MIX = {
+    "connect": 5,
+    "create": 3,
+    "join": 4,
+    "start": 3,
+    "move": 30,
+    "reset": 2,
+    "leave": 2,
+    "reconnect": 1,
+    "disconnect": 2
+}
+
+
+class SimClient:
+    def __init__(self, number):
+        self.player_id = f"soak_{number}"
+        self.client = None
+        self.session_token = None
+
+    def connect(self):
+        self.client = socketio.test_client(app.app)
+        self.client.emit("register_player", {
+            "player_id": self.player_id,
+            "player_name": self.player_id,
+            "session_token": self.session_token
+        })
+        for message in self.client.get_received():
+            if message["name"] == "player_registered":
+                self.session_token = message["args"][0]["session_token"]
+
+    @property
+    def connected(self):
+        return self.client is not None and self.client.is_connected()
+
+    def room(self):
+        return rooms.game_rooms.get(rooms.player_rooms.get(self.player_id))
+
+    def emit(self, event, **data):
+        self.client.emit(event, dict(data, player_id=self.player_id))
+        self.client.get_received()  # nothing is asserted; keep the queue from growing
+
+    def disconnect(self):
+        if self.connected:
+            self.client.disconnect()
+        if self.client is not None:
+            # The test client never forgets a connection; a closed transport would
+            SocketIOTestClient.clients.pop(self.client.eio_sid, None)
+            socketio.server.environ.pop(self.client.eio_sid, None)
+        self.client = None
+
+
+def act(action, sim, rng):
+    """Perform one action for sim if it applies; returns whether it did"""
+    if action == "connect":
+        if sim.connected or sim.session_token:
+            return False
+        sim.connect()
+        return True
+    if action == "reconnect":
+        if sim.connected or not sim.session_token or sim.player_id not in rooms.players:
+            return False
+        sim.connect()  # resumes the held seat with the session token
+        return True
+    if not sim.connected:
+        return False
+
+    room = sim.room()
+    if action == "create":
+        if room is not None:
+            return False
+        sim.emit("create_room", room_name="soak", variant=rng.choice(list(rooms.BOARD_VARIANTS)))
+    elif action == "join":
+        if room is not None:
+            return False
+        open_rooms, _, _ = rooms.search_rooms("open", None, 20)
+        if not open_rooms:
+            return False
+        sim.emit("join_room", room_id=rng.choice(open_rooms))
+    elif action == "start":
+        if room is None or not room.is_full() or room.game_state["game_active"]:
+            return False
+        sim.emit("start_game", room_id=room.room_id, action_id=f"{time.monotonic()}")
+    elif action == "move":
+        state = room.game_state if room is not None else None
+        if state is None or state["current_player"] != sim.player_id:
+            return False
+        empty = [i for i, cell in enumerate(state["board"]) if cell is None]
+        sim.emit("make_move", room_id=room.room_id, index=rng.choice(empty), action_id=f"{time.monotonic()}")
+    elif action == "reset":
+        if room is None or room.game_state["game_active"]:
+            return False
+        sim.emit("reset_game", room_id=room.room_id, action_id=f"{time.monotonic()}")
+    elif action == "leave":
+        if room is None:
+            return False
+        sim.emit("leave_room", room_id=room.room_id)
+    elif action == "disconnect":
+        sim.disconnect()  # abrupt: no leave_room first
+    return True
+
+
+def socket_room_count():
+    return sum(len(namespace_rooms) for namespace_rooms in socketio.server.manager.rooms.values())
+
+
+def registry_counts():
+    with rooms.room_index_lock:
+        indexed = sum(len(entries) for entries in rooms.room_indexes.values())
+    return {
+        "game_rooms": len(rooms.game_rooms),
+        "players": len(rooms.players),
+        "waiting_players": len(rooms.waiting_players),
+        "player_rooms": len(rooms.player_rooms),
+        "player_seat_counts": len(rooms.player_seat_counts),
+        "room_index_entries": indexed,
+        "rate_buckets": len(limits.rate_buckets),
+        "spectator_rooms": len(lobby.spectator_rooms),
+        "socket_rooms": socket_room_count()
+    }
+
+
+def run_phase(sims, mix, seconds, rng):
+    actions, weights = list(mix), list(mix.values())
+    deadline = time.monotonic() + seconds
+    done = 0
+    while time.monotonic() < deadline:
+        for _ in range(100):
+            if act(rng.choices(actions, weights)[0], rng.choice(sims), rng):
+                done += 1
+    return done
+
+
+def quiesce(sims):
+    for sim in sims:
+        sim.disconnect()
+    time.sleep(sessions.RECONNECT_GRACE_PERIOD + 0.1)
+    sessions.expire_disconnected_players()
+    lobby.flush_spectator_updates()
+    gc.collect()
+
+
+def parse_mix(text):
+    mix = dict(MIX)
+    for item in filter(None, (text or "").split(",")):
+        action, _, weight = item.partition("=")
+        if action not in MIX:
+            raise SystemExit(f"unknown action {action!r}; choose from {', '.join(MIX)}")
+        mix[action] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3600, help="seconds to run in total")
+    parser.add_argument("--phase", type=float, default=60, help="seconds of load between quiesces")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--mix", help="action weights, e.g. move=50,disconnect=5")
+    parser.add_argument("--tolerance", type=float, default=512, help="KB of traced growth allowed")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    tracemalloc.start(5)
+    baseline_counts = registry_counts()
+    baseline = None
+    end = time.monotonic() + args.duration
+    phase = 0
+
+    print(f"{'phase':>5} {'actions/s':>10} {'rooms':>6} {'players':>8} {'traced KB':>10} {'growth KB':>10}")
+    while True:
+        phase += 1
+        sims = [SimClient(f"{phase}_{i}") for i in range(args.clients)]
+        started = time.monotonic()
+        done = run_phase(sims, mix, min(args.phase, max(1, end - started)), rng)
+        rate = done / (time.monotonic() - started)
+        peak_rooms, peak_players = len(rooms.game_rooms), len(rooms.players)
+        quiesce(sims)
+        del sims
+
+        snapshot = tracemalloc.take_snapshot()
+        traced = sum(stat.size for stat in snapshot.statistics("filename"))
+        if baseline is None:
+            baseline, baseline_traced = snapshot, traced  # first quiesce warms caches and imports
+        growth = (traced - baseline_traced) / 1024
+        print(f"{phase:>5} {rate:>10.0f} {peak_rooms:>6} {peak_players:>8} {traced / 1024:>10.0f} {growth:>10.1f}")
+
+        counts = registry_counts()
+        leaked = {name: count for name, count in counts.items() if count != baseline_counts[name]}
+        if leaked or growth > args.tolerance:
+            for name, count in leaked.items():
+                print(f"LEAK {name}: {count} after quiesce, baseline {baseline_counts[name]}")
+            if growth > args.tolerance:
+                print(f"LEAK traced memory grew {growth:.0f} KB; largest increases:")
+                for stat in snapshot.compare_to(baseline, "traceback")[:5]:
+                    print(f"  {stat.size_diff / 1024:+.1f} KB in {stat.count_diff:+d} blocks")
+                    for line in stat.traceback.format()[-6:]:
+                        print(f"    {line}")
+            sys.exit(1)
+        if time.monotonic() >= end:
+            break
+    print(f"OK: {phase} phases, registries and memory back to baseline after each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Cold start cost: import time and time to the first page and connection.
+
+Each run is a fresh interpreter so nothing is cached between runs. Reports
+the median of each phase, measured from just before `import app`.
+
+Usage: python bench/startup.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.app.test_client().get("/")
+first_request = time.perf_counter()
+client = app.socketio.test_client(app.app)
+client.emit("get_rooms")
+client.get_received()
+first_event = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "first request": first_request - start,
+    "first socket event": first_event - start
+}))
+"""
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    env = dict(os.environ, SNAPSHOT_INTERVAL="0", SNAPSHOT_PATH=os.devnull + ".missing")
+    samples = {}
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+            capture_output=True, text=True, check=True
+        )
+        for phase, seconds in json.loads(result.stdout.strip().splitlines()[-1]).items():
+            samples.setdefault(phase, []).append(seconds)
+
+    print(f"{runs} cold starts, median / max ms")
+    for phase, values in samples.items():
+        print(f"  {phase:<20} {statistics.median(values) * 1000:>8.1f} {max(values) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
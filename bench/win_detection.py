@@ -0,0 +1,58 @@
+"""Compare full-board and incremental win detection at several board sizes.
+
+Usage: python bench/win_detection.py [games]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("SNAPSHOT_INTERVAL", "0")
+
+from tictactoe.rooms import check_winner, check_winner_at  # noqa: E402
+
+# (board size, run length)
+SIZES = [(3, 3), (7, 4), (15, 5), (19, 5)]
+
+
+def random_games(size, games, seed=0):
+    """Yield random move orders; each game is a shuffled list of cell indexes"""
+    rng = random.Random(seed)
+    cells = list(range(size * size))
+    for _ in range(games):
+        order = cells[:]
+        rng.shuffle(order)
+        yield order
+
+
+def play(size, run, order, detect):
+    board = [None] * (size * size)
+    for move, index in enumerate(order):
+        board[index] = 'X' if move % 2 == 0 else 'O'
+        if detect(board, size, run, index):
+            return move + 1
+    return len(order)
+
+
+def full_scan(board, size, run, index):
+    return check_winner(board, size, run)
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{games} random games per size")
+    print(f"{'board':<8} {'moves':>8} {'full us/move':>14} {'incremental us/move':>20} {'speedup':>8}")
+    for size, run in SIZES:
+        orders = list(random_games(size, games))
+        timings = {}
+        for name, detect in (("full", full_scan), ("incremental", check_winner_at)):
+            start = time.perf_counter()
+            moves = sum(play(size, run, order, detect) for order in orders)
+            timings[name] = (time.perf_counter() - start) / moves * 1e6
+        print(f"{f'{size}x{size}/{run}':<8} {moves:>8} {timings['full']:>14.2f} "
+              f"{timings['incremental']:>20.2f} {timings['full'] / timings['incremental']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
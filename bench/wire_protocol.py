@@ -0,0 +1,82 @@
+"""Compare JSON and MessagePack Socket.IO packets on a realistic event mix.
+
+Usage: python bench/wire_protocol.py [iterations]
+"""
+import sys
+import time
+
+from socketio import packet
+from socketio.msgpack_packet import MsgPackPacket
+
+SDP = "v=0\r\no=- 4611731400430051336 2 IN IP4 127.0.0.1\r\ns=-\r\nt=0 0\r\n" + (
+    "a=candidate:842163049 1 udp 1677729535 203.0.113.7 54400 typ srflx raddr 0.0.0.0 rport 0\r\n"
+    "a=ice-ufrag:EsAw\r\na=ice-pwd:bP+XJMM09aR8AiX1jdukzR6Y\r\n"
+    "a=fingerprint:sha-256 D2:FA:0E:C3:22:59:5E:14:95:69:92:3D:13:B4:84:24:2C:C2:A2:C0\r\n"
+) * 12
+
+# (event, payload, relative frequency) roughly matching a busy lobby with games in progress
+EVENT_MIX = [
+    ("move_made", {
+        "player_id": "player_k3j9x0aq", "index": 4, "symbol": "X",
+        "board": ["X", None, "O", None, "X", None, None, "O", None],
+        "current_player": "player_p2m8c7zt", "winner": None, "game_active": True, "moves": 4
+    }, 40),
+    ("stats_update", {"active_games": 1532, "online_players": 4210, "waiting_players": 37}, 30),
+    ("webrtc_candidate", {"player_id": "player_k3j9x0aq", "candidate": {
+        "candidate": "candidate:842163049 1 udp 1677729535 203.0.113.7 54400 typ srflx raddr 0.0.0.0 rport 0",
+        "sdpMid": "0", "sdpMLineIndex": 0, "usernameFragment": "EsAw"
+    }}, 16),
+    ("game_started", {"room_id": "a1b2c3d4", "symbol": "X", "your_turn": True, "is_host": True}, 4),
+    ("rooms_list", {"rooms": [
+        {"id": f"r{i:07d}", "name": f"Room r{i:07d}", "player_count": 1 + i % 2,
+         "is_full": bool(i % 2), "game_active": bool(i % 2)}
+        for i in range(25)
+    ]}, 6),
+    ("webrtc_offer", {"player_id": "player_k3j9x0aq", "offer": {"type": "offer", "sdp": SDP}}, 2),
+    ("webrtc_answer", {"player_id": "player_p2m8c7zt", "answer": {"type": "answer", "sdp": SDP}}, 2),
+]
+
+
+def wire_size(encoded):
+    return len(encoded.encode("utf-8")) if isinstance(encoded, str) else len(encoded)
+
+
+def run(packet_class, iterations):
+    total_bytes = 0
+    encode_time = 0.0
+    decode_time = 0.0
+
+    for event, payload, weight in EVENT_MIX:
+        count = iterations * weight // 100
+        pkt = packet_class(packet.EVENT, data=[event, payload])
+
+        start = time.perf_counter()
+        for _ in range(count):
+            encoded = pkt.encode()
+        encode_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(count):
+            packet_class(encoded_packet=encoded)
+        decode_time += time.perf_counter() - start
+
+        total_bytes += wire_size(encoded) * count
+
+    return total_bytes, encode_time, decode_time
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{iterations} events")
+    print(f"{'serializer':<10} {'bytes':>12} {'encode s':>10} {'decode s':>10}")
+    results = {}
+    for name, packet_class in (("json", packet.Packet), ("msgpack", MsgPackPacket)):
+        results[name] = run(packet_class, iterations)
+        total_bytes, encode_time, decode_time = results[name]
+        print(f"{name:<10} {total_bytes:>12} {encode_time:>10.3f} {decode_time:>10.3f}")
+
+    print(f"msgpack bytes vs json: {results['msgpack'][0] / results['json'][0]:.1%}")
+
+
+if __name__ == "__main__":
+    main()
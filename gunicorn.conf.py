@@ -0,0 +1,7 @@
+# gunicorn resets signal handlers in each worker after forking, so with
+# --preload the drain-on-SIGTERM handler has to be installed again here
+def post_worker_init(worker):
+    from tictactoe.drain import DRAIN_ON_SIGTERM, install_sigterm_handler
+
+    if DRAIN_ON_SIGTERM:
+        install_sigterm_handler()
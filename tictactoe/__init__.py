@@ -0,0 +1,32 @@
+"""Multi-player WebRTC tic-tac-toe signaling server"""
+import logging
+
+from flask import Flask
+from flask_cors import CORS
+
+from . import events  # noqa: F401  (registers the Socket.IO handlers)
+from .drain import DRAIN_ON_SIGTERM, install_sigterm_handler
+from .extensions import SOCKETIO_OPTIONS, socketio
+from .routes import bp
+from .services import start_background_services
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+def create_app():
+    """Build the Flask app and attach the Socket.IO server.
+
+    Nothing is started here; background services come up on the first
+    request or connection in whichever process serves it.
+    """
+    app = Flask(__name__)
+    CORS(app)
+    app.register_blueprint(bp)
+    app.before_request(start_background_services)
+    socketio.init_app(app, **SOCKETIO_OPTIONS)
+
+    if DRAIN_ON_SIGTERM:
+        install_sigterm_handler()
+    return app
+
+__all__ = ["create_app", "socketio"]
@@ -0,0 +1,125 @@
+"""Caps on rooms and players, and load shedding under memory pressure"""
+import heapq
+import logging
+import os
+import sys
+import time
+from collections import Counter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .extensions import socketio
+from .lobby import spectator_channel, spectator_rooms
+from .rooms import game_rooms, player_seat_counts, players, remove_room, room_index_lock, room_indexes
+from .tournaments import tournament_rooms
+
+logger = logging.getLogger(__name__)
+
+MAX_ROOMS = int(os.environ.get("MAX_ROOMS", 10000))
+MAX_PLAYERS = int(os.environ.get("MAX_PLAYERS", 20000))
+MAX_ROOMS_PER_PLAYER = int(os.environ.get("MAX_ROOMS_PER_PLAYER", 3))
+
+# Above MEMORY_LIMIT_MB of RSS new rooms are refused and every check evicts
+# SHED_FRACTION of the idle rooms, least recently active first. A room is idle
+# once it has no game in progress and no activity for EVICTION_IDLE_AGE.
+MEMORY_LIMIT_MB = int(os.environ.get("MEMORY_LIMIT_MB", 0))  # 0 disables
+SHED_FRACTION = float(os.environ.get("SHED_FRACTION", 0.1))
+EVICTION_IDLE_AGE = int(os.environ.get("EVICTION_IDLE_AGE", 60))  # seconds
+CAPACITY_CHECK_INTERVAL = float(os.environ.get("CAPACITY_CHECK_INTERVAL", 5))  # seconds
+
+capacity_stats = Counter()
+capacity_state = {"rss": 0, "under_pressure": False}
+
+def current_rss():
+    """Resident set size in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return 0
+        # Peak rather than current RSS, but it still tracks growth
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def idle_rooms():
+    """Rooms that may be evicted, found through the open/full indexes"""
+    with room_index_lock:
+        room_ids = [
+            room_id for state in ("open", "full")
+            for _, room_id in room_indexes.get((state, None), [])
+        ]
+    cutoff = time.time() - EVICTION_IDLE_AGE
+    return [
+        room for room in map(game_rooms.get, room_ids)
+        if room is not None and room.last_activity < cutoff and room.room_id not in tournament_rooms
+    ]
+
+def evict_room(room, reason):
+    room_id = room.room_id
+    payload = {"room_id": room_id, "reason": reason}
+    socketio.emit("room_closed", payload, room=room_id)
+    socketio.emit("room_closed", payload, room=spectator_channel(room_id))
+    for sid in list(room.spectators):
+        spectator_rooms.pop(sid, None)
+    socketio.close_room(room_id)
+    socketio.close_room(spectator_channel(room_id))
+    remove_room(room_id)
+    capacity_stats["rooms_evicted"] += 1
+
+def shed_idle_rooms(count, reason):
+    """Evict up to count idle rooms, least recently active first"""
+    victims = heapq.nsmallest(count, idle_rooms(), key=lambda room: room.last_activity)
+    for room in victims:
+        evict_room(room, reason)
+    if victims:
+        logger.info(f"Evicted {len(victims)} idle rooms ({reason})")
+    return len(victims)
+
+def check_memory_pressure():
+    rss = current_rss()
+    pressure = MEMORY_LIMIT_MB > 0 and rss > MEMORY_LIMIT_MB * 1024 * 1024
+    if pressure != capacity_state["under_pressure"]:
+        logger.warning(f"Memory pressure {'on' if pressure else 'off'}: RSS {rss // (1024 * 1024)} MB")
+    capacity_state.update(rss=rss, under_pressure=pressure)
+
+    if pressure:
+        idle = len(idle_rooms())
+        if idle:
+            shed_idle_rooms(max(1, int(idle * SHED_FRACTION)), "Server is low on memory")
+    return pressure
+
+def room_refusal(player_id):
+    """Reason a new room may not be opened for this player, or None"""
+    if capacity_state["under_pressure"]:
+        reason = "Server is low on memory, new rooms are paused"
+    elif player_seat_counts[player_id] >= MAX_ROOMS_PER_PLAYER:
+        reason = f"You already have {MAX_ROOMS_PER_PLAYER} open rooms, leave one first"
+    elif len(game_rooms) >= MAX_ROOMS and not shed_idle_rooms(1, "Server is at room capacity"):
+        reason = "Server is at room capacity, try again later"
+    else:
+        return None
+    capacity_stats["rooms_rejected"] += 1
+    return reason
+
+def player_refusal():
+    if len(players) >= MAX_PLAYERS:
+        capacity_stats["players_rejected"] += 1
+        return "Server is full, try again later"
+    return None
+
+def capacity_report():
+    return dict(
+        capacity_stats,
+        rooms=len(game_rooms),
+        max_rooms=MAX_ROOMS,
+        players=len(players),
+        max_players=MAX_PLAYERS,
+        max_rooms_per_player=MAX_ROOMS_PER_PLAYER,
+        rss_mb=round(capacity_state["rss"] / (1024 * 1024), 1),
+        memory_limit_mb=MEMORY_LIMIT_MB,
+        under_pressure=capacity_state["under_pressure"]
+    )
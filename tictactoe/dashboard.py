@@ -0,0 +1,120 @@
+"""Live metrics frames for the admin dashboard stream.
+
+One frame is built and encoded per tick and handed to every subscriber, so
+the cost of the dashboard does not grow with the number of viewers. A slow
+viewer skips to the latest frame rather than queueing old ones.
+"""
+import json
+import os
+import threading
+import time
+
+from . import lobby
+from .lanes import LANES, lane_report, take_lane_waits
+from .lobby import pending_spectator_updates, spectator_rooms
+from .metrics import game_stats, instrumentation_report, percentile, take_latencies
+from .rooms import ROOM_STATES, players, room_index_lock, room_indexes, waiting_players
+from .signaling import pending_candidates
+
+DASHBOARD_INTERVAL = float(os.environ.get("DASHBOARD_INTERVAL", 1))  # seconds
+KEEPALIVE_INTERVAL = 15  # seconds; lets the server notice viewers that left
+
+class FrameStream:
+    """Latest encoded frame, with a condition that wakes every subscriber"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.seq = 0
+        self.frame = None
+        self.subscribers = 0
+
+    def publish(self, data):
+        with self.condition:
+            self.seq += 1
+            self.frame = f"id: {self.seq}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+            self.condition.notify_all()
+
+    def subscribe(self):
+        """Generator of server-sent event chunks for one viewer"""
+        with self.condition:
+            self.subscribers += 1
+            seen, frame = self.seq, self.frame
+        try:
+            if frame:
+                yield frame
+            while True:
+                with self.condition:
+                    self.condition.wait_for(lambda: self.seq != seen, timeout=KEEPALIVE_INTERVAL)
+                    fresh = self.seq != seen
+                    seen, frame = self.seq, self.frame
+                yield frame if fresh else ": keepalive\n\n"
+        finally:
+            with self.condition:
+                self.subscribers -= 1
+
+dashboard_stream = FrameStream()
+last_tick = {"time": None, "moves": 0, "events": 0}
+
+def milliseconds(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+def contention_summary():
+    """Thread and handler gauges, plus total lock wait per lock when instrumented"""
+    report = instrumentation_report(reset_peak=True)
+    summary = {name: report[name] for name in ("threads", "handlers_running", "handlers_peak")}
+    if report["enabled"]:
+        summary["lock_wait_ms"] = {name: stats["wait_ms_total"] for name, stats in report["locks"].items()}
+        summary["slow_handlers"] = sum(report["slow_handlers"].values())
+    return summary
+
+def lane_summary():
+    """Slots in use, waiters and queue times since the last tick, per lane"""
+    report, waits = lane_report(), take_lane_waits()
+    return {
+        lane: {
+            "running": report["lanes"][lane]["running"],
+            "waiting": report["lanes"][lane]["waiting"],
+            "wait_ms_p95": milliseconds(percentile(waits[lane], 0.95)),
+            "wait_ms_max": milliseconds(waits[lane][-1] if waits[lane] else None)
+        }
+        for lane in LANES
+    }
+
+def build_frame():
+    now = time.monotonic()
+    elapsed = now - last_tick["time"] if last_tick["time"] else DASHBOARD_INTERVAL
+    moves, events = game_stats["moves"], game_stats["events"]
+    moves_per_sec = (moves - last_tick["moves"]) / elapsed
+    events_per_sec = (events - last_tick["events"]) / elapsed
+    last_tick.update(time=now, moves=moves, events=events)
+
+    with room_index_lock:
+        rooms_by_state = {state: len(room_indexes.get((state, None), ())) for state in ROOM_STATES}
+    samples = sorted(take_latencies())
+
+    return {
+        "time": round(time.time(), 3),
+        "rooms": rooms_by_state,
+        "players": len(players),
+        "spectators": len(spectator_rooms),
+        "moves_per_sec": round(moves_per_sec, 1),
+        "events_per_sec": round(events_per_sec, 1),
+        "latency_ms": {
+            "p50": milliseconds(percentile(samples, 0.5)),
+            "p95": milliseconds(percentile(samples, 0.95)),
+            "p99": milliseconds(percentile(samples, 0.99)),
+            "max": milliseconds(samples[-1] if samples else None)
+        },
+        "queues": {
+            "waiting_players": len(waiting_players),
+            "spectator_updates": len(pending_spectator_updates),
+            "candidate_batches": len(pending_candidates),
+            "stats_broadcast": int(lobby.stats_pending)
+        },
+        "lanes": lane_summary(),
+        "contention": contention_summary(),
+        "viewers": dashboard_stream.subscribers
+    }
+
+def publish_frame():
+    dashboard_stream.publish(build_frame())
@@ -0,0 +1,139 @@
+"""Room directory shared by the shards of one launcher.
+
+Each shard writes a summary of its rooms and lobby counters to its own file
+in SHARD_DIRECTORY every DIRECTORY_INTERVAL and reads the files of its peers,
+so get_rooms, quick match and the lobby stats cover every shard. Rooms owned
+elsewhere are listed as they were at the peer's last write; joining one
+sends the client to its owner with a migrate event. Without a directory
+(a single process) only local rooms are seen.
+"""
+import bisect
+import heapq
+import json
+import logging
+import os
+import time
+
+from .rooms import (
+    ROOM_PAGE_SIZE, game_rooms, players, room_state, search_rooms, waiting_players
+)
+from .sharding import SHARD_COUNT, SHARD_INDEX
+
+logger = logging.getLogger(__name__)
+
+SHARD_DIRECTORY = os.environ.get("SHARD_DIRECTORY")
+DIRECTORY_INTERVAL = float(os.environ.get("DIRECTORY_INTERVAL", 1))  # seconds
+DIRECTORY_ENABLED = SHARD_COUNT > 1 and bool(SHARD_DIRECTORY)
+STALE_AFTER = 5 * DIRECTORY_INTERVAL  # a peer that stopped writing is dropped
+
+# Rebuilt wholesale on every refresh and replaced by rebinding, so readers
+# always see one consistent version
+remote_rooms = {}  # room_id -> summary from the owning shard
+remote_indexes = {}  # (state, variant) -> sorted [(created_at, room_id)], None matching all
+remote_counts = {"active_games": 0, "online_players": 0, "waiting_players": 0, "shards": 0}
+
+def room_summary(room):
+    """The lobby's view of a room, as get_rooms sends it"""
+    return {
+        "id": room.room_id,
+        "name": f"Room {room.room_id}",
+        "player_count": len(room.players),
+        "is_full": room.is_full(),
+        "game_active": room.game_state["game_active"],
+        "spectators": len(room.spectators),
+        "variant": room.variant,
+        "state": room_state(room)
+    }
+
+def directory_path(shard):
+    return os.path.join(SHARD_DIRECTORY, f"shard-{shard}.json")
+
+def publish_directory():
+    """Write this shard's rooms and counters for its peers"""
+    rooms = [dict(room_summary(room), created_at=room.created_at) for room in list(game_rooms.values())]
+    body = {
+        "shard": SHARD_INDEX,
+        "written_at": time.time(),
+        "active_games": sum(1 for room in rooms if room["game_active"]),
+        "online_players": len(players),
+        "waiting_players": len(waiting_players),
+        "rooms": rooms
+    }
+    path = directory_path(SHARD_INDEX)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(body, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.error(f"Failed to publish room directory {path}: {e}")
+
+def refresh_directory():
+    """Reload every live peer's rooms and counters"""
+    global remote_rooms, remote_indexes, remote_counts
+    summaries, indexes = {}, {}
+    counts = {"active_games": 0, "online_players": 0, "waiting_players": 0, "shards": 0}
+    now = time.time()
+
+    for shard in range(SHARD_COUNT):
+        if shard == SHARD_INDEX:
+            continue
+        try:
+            with open(directory_path(shard), encoding="utf-8") as f:
+                body = json.load(f)
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping room directory of shard {shard}: {e}")
+            continue
+        if now - body["written_at"] > STALE_AFTER:
+            continue
+
+        counts["shards"] += 1
+        for name in ("active_games", "online_players", "waiting_players"):
+            counts[name] += body[name]
+        for summary in body["rooms"]:
+            created_at = summary.pop("created_at")
+            summaries[summary["id"]] = summary
+            entry = (created_at, summary["id"])
+            for key in ((summary["state"], summary["variant"]), (summary["state"], None),
+                        (None, summary["variant"]), (None, None)):
+                indexes.setdefault(key, []).append(entry)
+
+    for entries in indexes.values():
+        entries.sort()
+    remote_rooms, remote_indexes, remote_counts = summaries, indexes, counts
+
+def sync_directory():
+    publish_directory()
+    refresh_directory()
+
+def withdraw_directory():
+    """Remove this shard's entry so peers stop listing its rooms at once"""
+    if not DIRECTORY_ENABLED:
+        return
+    try:
+        os.remove(directory_path(SHARD_INDEX))
+    except OSError:
+        pass
+
+def search_all_rooms(state=None, variant=None, limit=ROOM_PAGE_SIZE, after=None):
+    """search_rooms over local rooms and every peer's, merged in creation order"""
+    room_ids, local_next, local_total = search_rooms(state, variant, limit, after)
+    local = [(room.created_at, room.room_id) for room in map(game_rooms.get, room_ids) if room is not None]
+
+    entries = remote_indexes.get((state, variant), [])
+    start = bisect.bisect_right(entries, after) if after is not None else 0
+    remote = entries[start:start + limit]
+
+    merged = list(heapq.merge(local, remote))
+    more = len(merged) > limit or local_next is not None or start + limit < len(entries)
+    page = merged[:limit]
+    next_entry = page[-1] if page and more else None
+    return [room_id for _, room_id in page], next_entry, local_total + len(entries)
+
+def remote_room_summary(room_id):
+    return remote_rooms.get(room_id)
+
+def directory_report():
+    return dict(remote_counts, enabled=DIRECTORY_ENABLED, remote_rooms=len(remote_rooms))
@@ -0,0 +1,85 @@
+"""Graceful drain and state handoff on shutdown"""
+import logging
+import os
+import signal
+import threading
+import time
+
+from flask_socketio import emit
+
+from .directory import withdraw_directory
+from .extensions import socketio
+from .metrics import tracked_lock
+from .rooms import game_rooms, room_indexes
+from .snapshot import save_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Graceful drain: stop opening games, let running ones finish until the
+# deadline, then write the remaining state to SNAPSHOT_PATH for the replacement
+# worker to load and tell clients to reconnect. Keep DRAIN_TIMEOUT below the
+# process manager's kill timeout (gunicorn --graceful-timeout, 30s by default).
+DRAIN_TIMEOUT = int(os.environ.get("DRAIN_TIMEOUT", 25))  # seconds
+DRAIN_ON_SIGTERM = os.environ.get("DRAIN_ON_SIGTERM", "1") != "0"
+drain_state = {"draining": False, "deadline": None, "handed_off": False}
+drain_lock = tracked_lock("drain")
+previous_sigterm_handler = None
+
+def active_game_count():
+    return len(room_indexes.get(("in_progress", None), []))
+
+def start_drain(timeout=DRAIN_TIMEOUT, resignal=False):
+    """Enter drain mode; a second call cuts the remaining wait short"""
+    with drain_lock:
+        if drain_state["draining"]:
+            drain_state["deadline"] = min(drain_state["deadline"], time.time() + timeout)
+            return False
+        drain_state["draining"] = True
+        drain_state["deadline"] = time.time() + timeout
+
+    logger.info(f"Draining: {active_game_count()} games in progress, deadline in {timeout}s")
+    socketio.emit("server_draining", {"deadline": timeout})
+    threading.Thread(target=run_drain, args=(resignal,), daemon=True).start()
+    return True
+
+def run_drain(resignal):
+    while active_game_count() and time.time() < drain_state["deadline"]:
+        time.sleep(0.5)
+
+    remaining = active_game_count()
+    save_snapshot()
+    withdraw_directory()
+    drain_state["handed_off"] = True
+    socketio.emit("server_handoff", {"games_in_progress": remaining})
+    logger.info(f"Drain complete: handed off {len(game_rooms)} rooms, {remaining} still in progress")
+
+    if resignal:
+        # The original handler is back in place, so this stops the process
+        os.kill(os.getpid(), signal.SIGTERM)
+
+def handle_sigterm(signum, frame):
+    # Hand SIGTERM back to the default (or process manager's) handler now, as
+    # only the main thread may do so; a second SIGTERM skips the wait
+    signal.signal(signal.SIGTERM, previous_sigterm_handler or signal.SIG_DFL)
+    start_drain(resignal=True)
+
+def install_sigterm_handler():
+    """Drain on SIGTERM; must run in the main thread of the serving process.
+
+    Under gunicorn --preload, workers reset their signal handlers after the
+    fork, so call this from the post_worker_init hook as gunicorn.conf.py does.
+    """
+    global previous_sigterm_handler
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    current = signal.getsignal(signal.SIGTERM)
+    if current is not handle_sigterm:
+        previous_sigterm_handler = current
+        signal.signal(signal.SIGTERM, handle_sigterm)
+    return True
+
+def reject_if_draining():
+    if drain_state["draining"]:
+        emit("error", {"message": "Server is shutting down, no new games"})
+        return True
+    return False
@@ -0,0 +1,680 @@
+"""Socket.IO event handlers"""
+import logging
+import secrets
+import time
+from datetime import datetime
+
+from flask import request
+from flask_socketio import ConnectionRefusedError, emit, join_room, leave_room
+
+from .capacity import player_refusal, room_refusal
+from .directory import remote_room_summary, room_summary, search_all_rooms
+from .drain import reject_if_draining
+from .extensions import socketio
+from .hints import best_moves
+from .limits import admit_handshake, rate_buckets, rate_limited
+from .lobby import (
+    LOBBY_TOPIC, SPECTATOR_CAP, broadcast_stats, queue_spectator_update, spectator_channel,
+    spectator_rooms, stats_payload, stop_spectating
+)
+from .metrics import game_stats
+from .rooms import (
+    BOARD_VARIANTS, MAX_ROOM_PAGE_SIZE, ROOM_PAGE_SIZE, ROOM_STATES, GameRoom, decode_room_cursor,
+    duplicate_actions, encode_room_cursor, game_rooms, player_rooms, players, register_room,
+    remove_room, waiting_players
+)
+from .services import start_background_services
+from .sharding import SHARD_INDEX, new_room_id, owns_room
+from .sessions import (
+    RECONNECT_GRACE_PERIOD, find_player_room, hold_player_seat, migrating_sids, release_player
+)
+from .signaling import candidate_lock, pending_candidates, signaling_peer_sid
+from .tournaments import forfeit_tournament_match, record_tournament_result, tournament_rooms
+
+logger = logging.getLogger(__name__)
+
+@socketio.on("connect")
+def handle_connect():
+    start_background_services()
+    retry_after = admit_handshake()
+    if retry_after:
+        raise ConnectionRefusedError({"message": "Server busy", "retry_after": retry_after})
+
+    logger.info(f"Client connected: {request.sid}")
+    emit("connected", {"sid": request.sid})
+
+@socketio.on("disconnect")
+def handle_disconnect():
+    logger.info(f"Client disconnected: {request.sid}")
+    rate_buckets.pop(request.sid, None)
+    stop_spectating(request.sid)
+    
+    # Find and remove player
+    player_id = None
+    for pid, player_info in list(players.items()):
+        if player_info.get('sid') == request.sid:
+            player_id = pid
+            break
+    
+    migrating = request.sid in migrating_sids
+    migrating_sids.discard(request.sid)
+
+    if player_id:
+        # Remove from waiting list
+        waiting_players[:] = [p for p in waiting_players if p != player_id]
+        
+        if RECONNECT_GRACE_PERIOD > 0 and not migrating:
+            # Keep the seat so a quick reconnect resumes the game
+            hold_player_seat(player_id, RECONNECT_GRACE_PERIOD)
+            logger.info(f"Player {player_id} disconnected, holding seat for {RECONNECT_GRACE_PERIOD}s")
+        else:
+            release_player(player_id)
+            logger.info(f"Player {player_id} disconnected")
+    
+    broadcast_stats()
+
+@socketio.on("register_player")
+@rate_limited("register_player")
+def handle_register_player(data):
+    player_id = data["player_id"]
+    player_name = data["player_name"]
+
+    retry_after = admit_handshake()
+    if retry_after:
+        emit("register_retry", {"retry_after": retry_after})
+        return
+
+    if player_id in players:
+        # Known player: within their reconnect grace period, restored from a
+        # snapshot, or reconnecting before the old socket timed out. Rebind
+        # the new socket instead of replacing the entry, so rooms holding
+        # this info dict stay in sync
+        player_info = players[player_id]
+        session_token = player_info.get("session_token")
+        if session_token is not None and data.get("session_token") != session_token:
+            emit("error", {"message": "Invalid session token"})
+            return
+
+        old_sid = player_info.get("sid")
+        room = find_player_room(player_id)
+        if old_sid is not None and old_sid != request.sid and room is not None:
+            leave_room(room.room_id, sid=old_sid)
+        player_info["sid"] = request.sid
+        player_info["session_token"] = session_token or secrets.token_urlsafe(16)
+        player_info.pop("resume_deadline", None)
+        logger.info(f"Player resumed: {player_id} ({player_name})")
+        emit("player_registered", {"player_id": player_id, "session_token": player_info["session_token"]})
+        room_id = resume_player_room(player_id)
+        if room_id:
+            emit("player_reconnected", {"player_id": player_id}, room=room_id, include_self=False)
+        broadcast_stats()
+        return
+
+    refusal = player_refusal()
+    if refusal:
+        emit("error", {"message": refusal})
+        return
+
+    players[player_id] = {
+        "name": player_name,
+        "sid": request.sid,
+        "session_token": secrets.token_urlsafe(16),
+        "connected_at": datetime.now().isoformat()
+    }
+
+    logger.info(f"Player registered: {player_id} ({player_name})")
+    emit("player_registered", {"player_id": player_id, "session_token": players[player_id]["session_token"]})
+    broadcast_stats()
+
+def resume_player_room(player_id):
+    """Rejoin a resumed player's socket to their room and resync its state"""
+    room = find_player_room(player_id)
+    if room is None:
+        return None
+
+    join_room(room.room_id)
+    emit("room_resumed", dict(room.snapshot(), **room.start_payload(player_id)))
+    logger.info(f"Player {player_id} resumed room {room.room_id}")
+    return room.room_id
+
+@socketio.on("create_room")
+@rate_limited("create_room")
+def handle_create_room(data):
+    player_id = data["player_id"]
+    room_name = data["room_name"]
+    variant = data.get("variant", "classic")
+    
+    if player_id not in players:
+        emit("error", {"message": "Player not registered"})
+        return
+    
+    if variant not in BOARD_VARIANTS:
+        emit("error", {"message": "Unknown board variant"})
+        return
+    
+    if reject_if_draining():
+        return
+    
+    refusal = room_refusal(player_id)
+    if refusal:
+        emit("error", {"message": refusal})
+        return
+    
+    room_id = new_room_id()
+    room = GameRoom(room_id, variant, p2p=bool(data.get("p2p")))
+    
+    player_info = players[player_id]
+    room.add_player(player_id, player_info)
+    register_room(room)
+    
+    # Join socket room
+    join_room(room_id)
+    
+    # Remove from waiting list
+    if player_id in waiting_players:
+        waiting_players.remove(player_id)
+    
+    emit("room_created", {
+        "room_id": room_id,
+        "room_name": room_name,
+        "variant": variant,
+        "size": room.size,
+        "run": room.run,
+        "p2p": room.p2p,
+        "players": [{"id": player_id, "name": player_info["name"]}]
+    })
+    
+    logger.info(f"Room created: {room_id} by {player_id}")
+    broadcast_stats()
+
+@socketio.on("join_room")
+@rate_limited("join_room")
+def handle_join_room(data):
+    player_id = data["player_id"]
+    room_id = data["room_id"]
+    
+    if player_id not in players:
+        emit("error", {"message": "Player not registered"})
+        return
+    
+    if not owns_room(room_id):
+        emit_migrate(room_id, "join")
+        return
+    
+    if room_id not in game_rooms:
+        emit("error", {"message": "Room not found"})
+        return
+    
+    room = game_rooms[room_id]
+    
+    if room.is_full():
+        emit("error", {"message": "Room is full"})
+        return
+    
+    if reject_if_draining():
+        return
+    
+    player_info = players[player_id]
+    room.add_player(player_id, player_info)
+    
+    # Join socket room
+    join_room(room_id)
+    
+    # Remove from waiting list
+    if player_id in waiting_players:
+        waiting_players.remove(player_id)
+    
+    # Get room name from first player
+    room_name = f"Room {room_id}"
+    
+    # Prepare players list
+    players_list = []
+    for pid, pinfo in room.players.items():
+        players_list.append({"id": pid, "name": pinfo["name"]})
+    
+    emit("room_joined", {
+        "room_id": room_id,
+        "room_name": room_name,
+        "variant": room.variant,
+        "size": room.size,
+        "run": room.run,
+        "players": players_list
+    })
+    
+    # Notify other players in room
+    emit("player_joined", {
+        "player_id": player_id,
+        "player_name": player_info["name"],
+        "players": players_list
+    }, room=room_id, include_self=False)
+    
+    # Check if room is now full and auto-start game
+    if room.is_full():
+        logger.info(f"Room {room_id} is full, auto-starting game")
+        # Auto-start the game when room is full
+        if room.start_game():
+            player_list = room.get_player_list()
+            
+            # Assign symbols and turns
+            for pid in player_list:
+                if players[pid]["sid"] is None:
+                    continue  # Player who has not reconnected yet
+                emit("game_started", room.start_payload(pid), room=players[pid]["sid"])
+
+            queue_spectator_update(room)
+            logger.info(f"Game auto-started in room {room_id}")
+    
+    logger.info(f"Player {player_id} joined room {room_id}")
+    broadcast_stats()
+
+def replay_action(room, player_id, action_id):
+    """Answer a retried action from the room's dedupe window, to the sender only"""
+    recalled = room.recall_action(player_id, action_id)
+    if recalled is None:
+        return False
+    event, payload = recalled
+    duplicate_actions[event] += 1
+    emit(event, dict(payload, duplicate=True))
+    return True
+
+def emit_migrate(room_id, action):
+    """Ask the client to reconnect through the router to the room's owner"""
+    # The client registers afresh on the owner; holding its seat here would
+    # only keep a stale session it cannot come back to
+    migrating_sids.add(request.sid)
+    emit("migrate", {"room_id": room_id, "action": action})
+    logger.info(f"Shard {SHARD_INDEX} sent {request.sid} to the owner of room {room_id}")
+
+@socketio.on("join_random_room")
+@rate_limited("join_random_room")
+def handle_join_random_room(data):
+    player_id = data["player_id"]
+    variant = data.get("variant", "classic")
+    
+    if player_id not in players:
+        emit("error", {"message": "Player not registered"})
+        return
+    
+    # Oldest open room of this variant, on any shard
+    room_ids, _, _ = search_all_rooms("open", variant, limit=1)
+    
+    if room_ids:
+        # Join existing room; one owned elsewhere answers with migrate
+        handle_join_room({"player_id": player_id, "room_id": room_ids[0]})
+    else:
+        # Create new room
+        room_name = f"{players[player_id]['name']}'s Room"
+        handle_create_room({"player_id": player_id, "room_name": room_name, "variant": variant})
+
+@socketio.on("leave_room")
+@rate_limited("leave_room")
+def handle_leave_room(data):
+    player_id = data["player_id"]
+    room_id = data["room_id"]
+    
+    if room_id not in game_rooms:
+        return
+    
+    room = game_rooms[room_id]
+    if player_id not in room.players or players.get(player_id, {}).get("sid") != request.sid:
+        # Not this socket's seat: it can only leave the socket room
+        leave_room(room_id)
+        emit("room_left", {"room_id": room_id})
+        return
+    abandoned = room.remove_player(player_id)
+    
+    # Leave socket room
+    leave_room(room_id)
+    
+    # Notify other players
+    emit("player_left", {"player_id": player_id}, room=room_id)
+    if abandoned and not room.is_empty():
+        emit("game_reset", room.reset_payload(), room=room_id)
+    
+    # Remove empty rooms
+    if room.is_empty():
+        remove_room(room_id)
+        logger.info(f"Removed empty room: {room_id}")
+    forfeit_tournament_match(room_id, player_id)
+    
+    emit("room_left", {"room_id": room_id})
+    logger.info(f"Player {player_id} left room {room_id}")
+    broadcast_stats()
+
+@socketio.on("join_lobby")
+@rate_limited("join_lobby")
+def handle_join_lobby(data=None):
+    join_room(LOBBY_TOPIC)
+    emit("stats_update", stats_payload())
+
+@socketio.on("leave_lobby")
+@rate_limited("leave_lobby")
+def handle_leave_lobby(data=None):
+    leave_room(LOBBY_TOPIC)
+
+@socketio.on("spectate_room")
+@rate_limited("spectate_room")
+def handle_spectate_room(data):
+    player_id = data.get("player_id")
+    room_id = data["room_id"]
+
+    if not owns_room(room_id):
+        emit_migrate(room_id, "spectate")
+        return
+
+    if room_id not in game_rooms:
+        emit("error", {"message": "Room not found"})
+        return
+
+    room = game_rooms[room_id]
+
+    if len(room.spectators) >= SPECTATOR_CAP:
+        emit("error", {"message": "Spectator limit reached"})
+        return
+
+    stop_spectating(request.sid)
+    room.spectators[request.sid] = players[player_id]["name"] if player_id in players else "Guest"
+    spectator_rooms[request.sid] = room_id
+    join_room(spectator_channel(room_id))
+
+    emit("spectate_snapshot", room.snapshot())
+    logger.info(f"Spectator {request.sid} watching room {room_id}")
+
+@socketio.on("stop_spectating")
+@rate_limited("stop_spectating")
+def handle_stop_spectating(data=None):
+    room_id = stop_spectating(request.sid)
+    if room_id:
+        emit("spectate_stopped", {"room_id": room_id})
+
+@socketio.on("start_game")
+@rate_limited("start_game")
+def handle_start_game(data):
+    player_id = data["player_id"]
+    room_id = data["room_id"]
+    
+    if room_id not in game_rooms:
+        emit("error", {"message": "Room not found"})
+        return
+    
+    room = game_rooms[room_id]
+    
+    with room.action_lock:
+        if replay_action(room, player_id, data.get("action_id")):
+            return
+        
+        if not room.is_full():
+            emit("error", {"message": "Need 2 players to start game"})
+            return
+        
+        # Check if game is already started
+        if room.game_state["game_active"]:
+            emit("error", {"message": "Game already in progress"})
+            return
+        
+        if reject_if_draining():
+            return
+        
+        if not room.start_game():
+            return
+        player_list = room.get_player_list()
+
+        # Assign symbols and turns
+        for pid in player_list:
+            if players[pid]["sid"] is None:
+                continue  # Player who has not reconnected yet
+            emit("game_started", room.start_payload(pid), room=players[pid]["sid"])
+        room.remember_action(player_id, data.get("action_id"), "game_started", room.start_payload(player_id))
+
+    queue_spectator_update(room)
+    logger.info(f"Game manually started in room {room_id}")
+    broadcast_stats()
+
+@socketio.on("get_rooms")
+@rate_limited("get_rooms")
+def handle_get_rooms(data=None):
+    """One page of rooms, optionally filtered by state and variant.
+
+    Pass the returned next_cursor back as cursor to fetch the following page.
+    """
+    data = data or {}
+    state = data.get("state")
+    variant = data.get("variant")
+    
+    if state not in (None, *ROOM_STATES) or (variant is not None and variant not in BOARD_VARIANTS):
+        emit("error", {"message": "Invalid room filter"})
+        return
+    
+    try:
+        limit = max(1, min(int(data.get("limit") or ROOM_PAGE_SIZE), MAX_ROOM_PAGE_SIZE))
+        after = decode_room_cursor(data.get("cursor"))
+    except (TypeError, ValueError):
+        emit("error", {"message": "Invalid room query"})
+        return
+    
+    room_ids, next_entry, total = search_all_rooms(state, variant, limit, after)
+    rooms_list = []
+    for room_id in room_ids:
+        room = game_rooms.get(room_id)
+        summary = room_summary(room) if room is not None else remote_room_summary(room_id)
+        if summary is not None:
+            rooms_list.append(summary)
+    
+    emit("rooms_list", {
+        "rooms": rooms_list,
+        "cursor": data.get("cursor"),
+        "next_cursor": encode_room_cursor(next_entry),
+        "total": total
+    })
+
+@socketio.on("make_move")
+@rate_limited("make_move")
+def handle_make_move(data):
+    player_id = data["player_id"]
+    room_id = data["room_id"]
+    index = data["index"]
+    
+    if room_id not in game_rooms:
+        emit("error", {"message": "Room not found"})
+        return
+    
+    room = game_rooms[room_id]
+    
+    # Recall, apply and remember as one step, so a retry arriving while the
+    # original is still running waits for its result instead of racing it
+    with room.action_lock:
+        if replay_action(room, player_id, data.get("action_id")):
+            return
+        
+        try:
+            symbol = room.make_move(player_id, index)
+        except ValueError as e:
+            emit("error", {"message": str(e)})
+            return
+        game_stats["moves"] += 1
+        
+        # Broadcast move to all players in room
+        move = {
+            "player_id": player_id,
+            "index": index,
+            "symbol": symbol,
+            "board": list(room.game_state["board"]),
+            "current_player": room.game_state["current_player"],
+            "winner": room.game_state["winner"],
+            "game_active": room.game_state["game_active"],
+            "moves": room.game_state["moves"],
+            "hash": room.chain_head,
+            "action_id": data.get("action_id")
+        }
+        emit("move_made", move, room=room_id)
+        room.remember_action(player_id, data.get("action_id"), "move_made", move)
+    
+    queue_spectator_update(room, {"index": index, "symbol": symbol})
+    logger.info(f"Move made in room {room_id}: player {player_id} at index {index}")
+
+    if room.game_state["winner"] and room_id in tournament_rooms:
+        record_tournament_result(room_id, room.game_state["winner"])
+    broadcast_stats()
+
+@socketio.on("request_hint")
+@rate_limited("request_hint")
+def handle_request_hint(data):
+    player_id = data["player_id"]
+    room_id = data["room_id"]
+
+    if room_id not in game_rooms:
+        emit("error", {"message": "Room not found"})
+        return
+
+    room = game_rooms[room_id]
+
+    if not room.game_state["game_active"]:
+        emit("error", {"message": "Game not active"})
+        return
+
+    if room.game_state["current_player"] != player_id:
+        emit("error", {"message": "Not your turn"})
+        return
+
+    moves, outcome = best_moves(room.game_state["board"], room.size, room.run)
+    emit("hint", {
+        "room_id": room_id,
+        "moves": moves,
+        "outcome": outcome,
+        "board_moves": room.game_state["moves"]
+    })
+
+@socketio.on("settle_moves")
+@rate_limited("settle_moves")
+def handle_settle_moves(data):
+    player_id = data["player_id"]
+    room_id = data["room_id"]
+    entries = data["moves"]
+    
+    room = game_rooms.get(room_id)
+    if room is None or not room.p2p:
+        emit("error", {"message": "Room is not in peer-to-peer mode"})
+        return
+    
+    # The log can downgrade the room, so only a seated player's own socket may send it
+    if player_rooms.get(player_id) != room_id or players.get(player_id, {}).get("sid") != request.sid:
+        emit("error", {"message": "Not in this room"})
+        return
+    
+    try:
+        applied = room.apply_move_log(entries)
+    except (KeyError, TypeError, ValueError) as e:
+        # Fall back to server-authoritative moves for the rest of the game
+        room.p2p = False
+        logger.warning(f"Rejected move log in room {room_id} from {player_id}: {e}")
+        emit("settlement_rejected", dict(room.snapshot(), reason=str(e),
+                                         equivocator=getattr(e, "player_id", None)), room=room_id)
+        return
+    
+    if not applied:
+        return
+    game_stats["moves"] += len(applied)
+    
+    for entry in applied:
+        queue_spectator_update(room, {"index": entry["index"], "symbol": entry["symbol"]})
+    
+    emit("moves_settled", {
+        "room_id": room_id,
+        "moves": room.game_state["moves"],
+        "hash": room.chain_head,
+        "winner": room.game_state["winner"],
+        "game_active": room.game_state["game_active"]
+    }, room=room_id)
+    logger.info(f"Settled {len(applied)} peer-to-peer moves in room {room_id}")
+    
+    if room.game_state["winner"]:
+        if room_id in tournament_rooms:
+            record_tournament_result(room_id, room.game_state["winner"])
+        broadcast_stats()
+
+@socketio.on("reset_game")
+@rate_limited("reset_game")
+def handle_reset_game(data):
+    player_id = data["player_id"]
+    room_id = data["room_id"]
+    
+    if room_id not in game_rooms:
+        emit("error", {"message": "Room not found"})
+        return
+    
+    room = game_rooms[room_id]
+
+    if room_id in tournament_rooms:
+        emit("error", {"message": "Tournament games cannot be reset"})
+        return
+
+    with room.action_lock:
+        if replay_action(room, player_id, data.get("action_id")):
+            return
+
+        if reject_if_draining():
+            return
+
+        # Reset game state
+        room.reset_game()
+        
+        # Broadcast reset to all players in room
+        reset = room.reset_payload()
+        emit("game_reset", reset, room=room_id)
+        room.remember_action(player_id, data.get("action_id"), "game_reset", reset)
+    
+    queue_spectator_update(room)
+    room.last_activity = time.time()
+    logger.info(f"Game reset in room {room_id} by player {player_id}")
+    broadcast_stats()
+
+@socketio.on("webrtc_offer")
+@rate_limited("webrtc_offer")
+def handle_webrtc_offer(data):
+    player_id = data["player_id"]
+    room_id = data["room_id"]
+    offer = data["offer"]
+    
+    peer_sid = signaling_peer_sid(player_id, room_id)
+    if peer_sid is None:
+        emit("error", {"message": "No peer to signal"})
+        return
+    
+    # Send offer straight to the other player
+    emit("webrtc_offer", {
+        "player_id": player_id,
+        "offer": offer
+    }, room=peer_sid)
+
+@socketio.on("webrtc_answer")
+@rate_limited("webrtc_answer")
+def handle_webrtc_answer(data):
+    player_id = data["player_id"]
+    room_id = data["room_id"]
+    answer = data["answer"]
+    
+    peer_sid = signaling_peer_sid(player_id, room_id)
+    if peer_sid is None:
+        emit("error", {"message": "No peer to signal"})
+        return
+    
+    # Send answer straight to the other player
+    emit("webrtc_answer", {
+        "player_id": player_id,
+        "answer": answer
+    }, room=peer_sid)
+
+@socketio.on("webrtc_candidate")
+@rate_limited("webrtc_candidate")
+def handle_webrtc_candidate(data):
+    player_id = data["player_id"]
+    room_id = data["room_id"]
+    candidate = data["candidate"]
+    
+    peer_sid = signaling_peer_sid(player_id, room_id)
+    if peer_sid is None:
+        return  # Trickle candidates for a stale session are dropped
+    
+    # Coalesced with other candidates for the same peer, see flush_candidates
+    with candidate_lock:
+        pending_candidates.setdefault((peer_sid, player_id), []).append(candidate)
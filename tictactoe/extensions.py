@@ -0,0 +1,34 @@
+"""The Socket.IO server, configured by create_app()"""
+import os
+
+from flask_socketio import SocketIO
+
+# Wire protocol: "json" (default) or "msgpack" (requires the msgpack package)
+WIRE_PROTOCOL = os.environ.get("WIRE_PROTOCOL", "json")
+SOCKETIO_CLIENT_URLS = {
+    "json": "https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.0.0/socket.io.js",
+    "msgpack": "https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.0.0/socket.io.msgpack.min.js"
+}
+
+# Compression: polling responses of at least COMPRESSION_THRESHOLD bytes are
+# gzip/deflate encoded; websocket permessage-deflate is negotiated by the
+# websocket server whenever the browser offers it
+HTTP_COMPRESSION = os.environ.get("HTTP_COMPRESSION", "1") != "0"
+COMPRESSION_THRESHOLD = int(os.environ.get("COMPRESSION_THRESHOLD", 1024))  # bytes
+
+# Fix for deployment issues - Updated configuration
+SOCKETIO_OPTIONS = dict(
+    cors_allowed_origins="*",
+    logger=False,
+    engineio_logger=False,
+    async_mode='threading',
+    transports=['websocket', 'polling'],
+    ping_timeout=60,
+    ping_interval=25,
+    max_http_buffer_size=1000000,
+    http_compression=HTTP_COMPRESSION,
+    compression_threshold=COMPRESSION_THRESHOLD,
+    serializer='msgpack' if WIRE_PROTOCOL == 'msgpack' else 'default'
+)
+
+socketio = SocketIO()
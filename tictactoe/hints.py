@@ -0,0 +1,244 @@
+"""Move hints backed by a symmetry-canonicalized transposition cache.
+
+Boards use the same encoding as check_winner: a flat list of 'X', 'O' or None
+with index row * size + col. Before lookup a board is reduced to the smallest
+of its 8 rotations and reflections, so equivalent positions share one cache
+entry, and cached moves are mapped back through the winning permutation.
+
+Positions with at most HINT_EXACT_CELLS empty cells are solved exactly by
+negamax, caching every position the search visits. Larger ones fall back to
+ranking the cells next to existing marks by the open runs they extend or block.
+"""
+import logging
+import os
+import sys
+from collections import Counter, OrderedDict
+
+from .metrics import tracked_lock
+from .rooms import check_winner_at
+
+logger = logging.getLogger(__name__)
+
+HINT_EXACT_CELLS = int(os.environ.get("HINT_EXACT_CELLS", 9))
+HINT_CACHE_MB = float(os.environ.get("HINT_CACHE_MB", 8))
+ENTRY_OVERHEAD = 100  # bytes per OrderedDict node and hash slot, roughly
+
+CELL_CODES = {None: ".", "X": "X", "O": "O"}
+
+# "hits"/"misses" count hint requests answered from the cache or not;
+# "search_hits"/"search_misses" count the lookups made inside the solver
+hint_stats = Counter()
+
+def board_symmetries(size):
+    """The 8 index permutations of a size x size board, each with its inverse.
+
+    For a permutation p the transformed board is [board[i] for i in p].
+    """
+    last = size - 1
+    transforms = (
+        lambda r, c: (r, c),
+        lambda r, c: (c, last - r),
+        lambda r, c: (last - r, last - c),
+        lambda r, c: (last - c, r),
+        lambda r, c: (r, last - c),
+        lambda r, c: (last - c, last - r),
+        lambda r, c: (last - r, c),
+        lambda r, c: (c, r)
+    )
+    symmetries = []
+    for transform in transforms:
+        perm = tuple(
+            row * size + col
+            for row, col in (transform(*divmod(i, size)) for i in range(size * size))
+        )
+        inverse = [0] * len(perm)
+        for i, source in enumerate(perm):
+            inverse[source] = i
+        symmetries.append((perm, tuple(inverse)))
+    return symmetries
+
+_symmetries = {}
+
+def canonical_form(board, size):
+    """Smallest encoding of the board under symmetry, with its permutation pair"""
+    if size not in _symmetries:
+        _symmetries[size] = board_symmetries(size)
+    encoded = "".join(CELL_CODES[cell] for cell in board)
+    return min(
+        ("".join(map(encoded.__getitem__, perm)), perm, inverse)
+        for perm, inverse in _symmetries[size]
+    )
+
+class TranspositionCache:
+    """LRU of canonical position -> (score, best moves) held under a byte budget"""
+
+    def __init__(self, budget_bytes):
+        self.budget = budget_bytes
+        self.bytes = 0
+        self.entries = OrderedDict()  # key -> (value, size in bytes)
+        self.lock = tracked_lock("hint_cache")
+
+    @staticmethod
+    def entry_size(key, value):
+        score, moves = value
+        return sys.getsizeof(key) + sys.getsizeof(value) + sys.getsizeof(moves) + ENTRY_OVERHEAD
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.entry_size(key, value)
+        if size > self.budget:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.budget:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+                hint_stats["evictions"] += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+hint_cache = TranspositionCache(int(HINT_CACHE_MB * 1024 * 1024))
+
+def lookup(board, size, run, kind):
+    """Cached (score, moves) for the board in its own coordinates, or None"""
+    key, perm, _ = canonical_form(board, size)
+    cached = hint_cache.get(f"{kind}{run}:{key}")
+    if cached is None:
+        return None
+    score, moves = cached
+    return score, [perm[i] for i in moves]
+
+def store(board, size, run, kind, score, moves):
+    key, _, inverse = canonical_form(board, size)
+    hint_cache.put(f"{kind}{run}:{key}", (score, tuple(sorted(inverse[i] for i in moves))))
+
+def solve(board, size, run, symbol, empty):
+    """Negamax value of the board for symbol to move, and every move reaching it.
+
+    A win scores the number of empty cells left before the winning move, so
+    quicker wins rank higher and slower losses are preferred.
+    """
+    cached = lookup(board, size, run, "x")
+    hint_stats["search_misses" if cached is None else "search_hits"] += 1
+    if cached is not None:
+        return cached
+
+    other = "O" if symbol == "X" else "X"
+    best, moves = None, []
+    for index, cell in enumerate(board):
+        if cell is not None:
+            continue
+        board[index] = symbol
+        if check_winner_at(board, size, run, index):
+            score = empty
+        elif empty == 1:
+            score = 0
+        else:
+            score = -solve(board, size, run, other, empty - 1)[0]
+        board[index] = None
+        if best is None or score > best:
+            best, moves = score, [index]
+        elif score == best:
+            moves.append(index)
+
+    store(board, size, run, "x", best, moves)
+    return best, moves
+
+def candidate_cells(board, size):
+    """Empty cells touching a mark, or the centre of an empty board"""
+    marked = [i for i, cell in enumerate(board) if cell is not None]
+    if not marked:
+        return [(size // 2) * size + size // 2]
+    candidates = set()
+    for index in marked:
+        row, col = divmod(index, size)
+        for r in range(max(0, row - 1), min(size, row + 2)):
+            for c in range(max(0, col - 1), min(size, col + 2)):
+                if board[r * size + c] is None:
+                    candidates.add(r * size + c)
+    return sorted(candidates)
+
+def threat_score(board, size, run, index, symbol):
+    """Weight of the open runs through index that symbol would extend or block.
+
+    Every window of run cells through index counts once: for symbol when the
+    opponent has no mark in it, against symbol when symbol has none. Extending
+    counts double, so a win beats a block but a block beats a shorter threat.
+    """
+    row, col = divmod(index, size)
+    score = 0
+    for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for offset in range(run):
+            start_row, start_col = row - d_row * offset, col - d_col * offset
+            end_row, end_col = start_row + d_row * (run - 1), start_col + d_col * (run - 1)
+            if not (0 <= start_row < size and 0 <= end_row < size
+                    and 0 <= start_col < size and 0 <= end_col < size):
+                continue
+            window = [
+                board[(start_row + d_row * k) * size + start_col + d_col * k]
+                for k in range(run)
+            ]
+            own = window.count(symbol)
+            theirs = run - own - window.count(None)
+            if not theirs:
+                score += 2 * 10 ** own
+            if not own:
+                score += 10 ** theirs
+    return score
+
+def rank_moves(board, size, run, symbol):
+    cached = lookup(board, size, run, "h")
+    hint_stats["misses" if cached is None else "hits"] += 1
+    if cached is not None:
+        return cached[1]
+
+    scores = {i: threat_score(board, size, run, i, symbol) for i in candidate_cells(board, size)}
+    best = max(scores.values())
+    moves = [i for i, score in scores.items() if score == best]
+    store(board, size, run, "h", None, moves)
+    return moves
+
+def best_moves(board, size, run):
+    """Hint for the side to move: (moves, outcome), outcome None when not solved.
+
+    X always moves first, so the side to move follows from the mark counts.
+    """
+    board = list(board)
+    symbol = "X" if board.count("X") == board.count("O") else "O"
+    empty = board.count(None)
+    hint_stats["requests"] += 1
+
+    if empty <= HINT_EXACT_CELLS:
+        cached = lookup(board, size, run, "x")
+        hint_stats["misses" if cached is None else "hits"] += 1
+        score, moves = cached if cached is not None else solve(board, size, run, symbol, empty)
+        outcome = "win" if score > 0 else "loss" if score < 0 else "draw"
+        # Equal under perfect play; prefer the moves that keep most pressure on
+        threats = {i: threat_score(board, size, run, i, symbol) for i in moves}
+        best = max(threats.values())
+        return [i for i in moves if threats[i] == best], outcome
+    return rank_moves(board, size, run, symbol), None
+
+def hint_report():
+    lookups = hint_stats["hits"] + hint_stats["misses"]
+    return dict(
+        hint_stats,
+        entries=len(hint_cache.entries),
+        cache_kb=round(hint_cache.bytes / 1024, 1),
+        budget_kb=round(hint_cache.budget / 1024, 1),
+        hit_rate=round(hint_stats["hits"] / lookups, 3) if lookups else None
+    )
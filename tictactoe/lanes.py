@@ -0,0 +1,145 @@
+"""Priority lanes for the Socket.IO handlers.
+
+In threading mode every event arrives on a thread of its own. Before a
+handler runs it takes a slot in its event's lane: at most HANDLER_WORKERS
+handlers run at once, and at most LANE_WORKERS[lane] of them from one lane.
+A freed slot goes to the oldest waiter of the highest-priority lane that is
+under its limit, so moves are served before signaling and signaling before
+lobby traffic. The lower lanes' limits add up to less than HANDLER_WORKERS,
+which keeps slots free for gameplay however much lobby traffic is queued.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from .metrics import LATENCY_SAMPLES, tracked_lock
+
+LANES_ENABLED = os.environ.get("LANES_ENABLED", "1") != "0"
+LANES = ("game", "signaling", "lobby")  # highest priority first
+EVENT_LANES = {
+    "make_move": "game",
+    "settle_moves": "game",
+    "reset_game": "game",
+    "start_game": "game",
+    "leave_room": "game",
+    "webrtc_offer": "signaling",
+    "webrtc_answer": "signaling",
+    "webrtc_candidate": "signaling"
+}  # any other event is lobby traffic
+HANDLER_WORKERS = int(os.environ.get("HANDLER_WORKERS", 32))
+LANE_WORKERS = {"game": 32, "signaling": 12, "lobby": 12}
+# Override limits with e.g. LANE_WORKERS='{"lobby": 4}'
+LANE_WORKERS.update(json.loads(os.environ.get("LANE_WORKERS", "{}")))
+LANE_QUEUE_LIMIT = int(os.environ.get("LANE_QUEUE_LIMIT", 256))  # waiters per lane before shedding
+
+lane_stats = {lane: Counter() for lane in LANES}  # "dispatched", "queued", "shed", "wait_total", "wait_max"
+lane_waits = {lane: deque(maxlen=LATENCY_SAMPLES) for lane in LANES}  # seconds queued, per dispatch
+holder = threading.local()  # depth of lane slots held by this thread
+
+class LaneScheduler:
+    """Hands out handler slots by lane priority; each lane's waiters are FIFO"""
+
+    def __init__(self, workers, lane_workers):
+        self.workers = workers
+        self.limits = lane_workers
+        self.lock = tracked_lock("lanes")
+        self.busy = 0
+        self.running = Counter()
+        self.queues = {lane: deque() for lane in LANES}  # threading.Event per waiter
+
+    def grant(self, lane):
+        self.busy += 1
+        self.running[lane] += 1
+
+    def acquire(self, lane):
+        """Wait for a slot in lane; returns the seconds queued, or None when shed"""
+        with self.lock:
+            queue = self.queues[lane]
+            # Waiters in higher lanes are only held by their own limits while
+            # a slot is free, so they have no claim on it
+            if self.busy < self.workers and self.running[lane] < self.limits[lane] and not queue:
+                self.grant(lane)
+                return 0.0
+            if len(queue) >= LANE_QUEUE_LIMIT:
+                return None
+            turn = threading.Event()
+            queue.append(turn)
+        queued = time.perf_counter()
+        turn.wait()  # release() grants the slot before setting it
+        return time.perf_counter() - queued
+
+    def release(self, lane):
+        with self.lock:
+            self.busy -= 1
+            self.running[lane] -= 1
+            while self.busy < self.workers:
+                lane = next((name for name in LANES
+                             if self.queues[name] and self.running[name] < self.limits[name]), None)
+                if lane is None:
+                    break
+                self.grant(lane)
+                self.queues[lane].popleft().set()
+
+scheduler = LaneScheduler(HANDLER_WORKERS, LANE_WORKERS)
+
+def lane_for(event):
+    return EVENT_LANES.get(event, "lobby")
+
+def enter_lane(event):
+    """Block until the event's lane has a slot; returns the lane, or None if shed.
+
+    A handler called from another handler runs in the caller's slot.
+    """
+    lane = lane_for(event)
+    depth = getattr(holder, "depth", 0)
+    if not LANES_ENABLED or depth:
+        holder.depth = depth + 1
+        return lane
+
+    waited = scheduler.acquire(lane)
+    stats = lane_stats[lane]
+    if waited is None:
+        stats["shed"] += 1
+        return None
+    holder.depth = 1
+    stats["dispatched"] += 1
+    if waited:
+        stats["queued"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+    lane_waits[lane].append(waited)
+    return lane
+
+def handler_depth():
+    """Handlers the calling thread is inside, counting the current one"""
+    return getattr(holder, "depth", 0)
+
+def leave_lane(lane):
+    holder.depth -= 1
+    if LANES_ENABLED and not holder.depth:
+        scheduler.release(lane)
+
+def take_lane_waits():
+    """Remove and return each lane's queue times recorded so far, sorted"""
+    return {
+        lane: sorted(waits.popleft() for _ in range(len(waits)))
+        for lane, waits in lane_waits.items()
+    }
+
+def lane_report():
+    lanes = {}
+    for lane in LANES:
+        stats = lane_stats[lane]
+        lanes[lane] = {
+            "limit": scheduler.limits[lane],
+            "running": scheduler.running[lane],
+            "waiting": len(scheduler.queues[lane]),
+            "dispatched": stats["dispatched"],
+            "queued": stats["queued"],
+            "shed": stats["shed"],
+            "wait_ms_total": round(stats["wait_total"] * 1000, 3),
+            "wait_ms_max": round(stats["wait_max"] * 1000, 3)
+        }
+    return {"enabled": LANES_ENABLED, "workers": HANDLER_WORKERS, "busy": scheduler.busy, "lanes": lanes}
@@ -0,0 +1,80 @@
+"""Run one server process per shard behind the front router.
+
+Usage: python -m tictactoe.launcher [--workers N] [--port PORT]
+
+Worker i listens on PORT + 1 + i with SHARD_INDEX=i and its own snapshot
+file. The workers share a room directory (SHARD_DIRECTORY, a temporary
+directory unless set) so every lobby lists every shard's rooms. SIGTERM or Ctrl-C is passed on to the workers, which drain their games
+while the router keeps forwarding, and the launcher exits once they are gone.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+
+from .router import ShardRouter, serve
+from .snapshot import SNAPSHOT_PATH
+
+logger = logging.getLogger(__name__)
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+def start_workers(count, host, base_port, directory):
+    workers = []
+    for shard in range(count):
+        env = dict(
+            os.environ,
+            PORT=str(base_port + 1 + shard),
+            SHARD_INDEX=str(shard),
+            SHARD_COUNT=str(count),
+            SHARD_DIRECTORY=directory,
+            SNAPSHOT_PATH=f"{SNAPSHOT_PATH}.{shard}"
+        )
+        workers.append(subprocess.Popen([sys.executable, APP_PATH], env=env))
+    return workers, [(host, base_port + 1 + shard) for shard in range(count)]
+
+async def run(count, host, port):
+    directory = os.environ.get("SHARD_DIRECTORY") or tempfile.mkdtemp(prefix="tictactoe-shards-")
+    os.makedirs(directory, exist_ok=True)
+    workers, backends = start_workers(count, "127.0.0.1", port, directory)
+    server = await serve(ShardRouter(backends), host, port)
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stopping.set)
+
+    async def watch(worker):
+        code = await asyncio.to_thread(worker.wait)
+        if not stopping.is_set():
+            logger.error(f"Worker {worker.pid} exited with {code}")
+
+    watchers = [asyncio.create_task(watch(worker)) for worker in workers]
+    await stopping.wait()
+
+    logger.info(f"Stopping {count} workers")
+    for worker in workers:
+        if worker.poll() is None:
+            worker.send_signal(signal.SIGTERM)
+    await asyncio.gather(*watchers)
+    server.close()
+    if not os.environ.get("SHARD_DIRECTORY"):
+        shutil.rmtree(directory, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5000)))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.workers, args.host, args.port))
+
+if __name__ == "__main__":
+    main()
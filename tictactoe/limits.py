@@ -0,0 +1,206 @@
+"""Per-connection rate limits, payload size budgets and admission control"""
+import functools
+import json
+import os
+import random
+import time
+from collections import Counter
+
+from flask import request
+from flask_socketio import emit
+
+from .lanes import enter_lane, handler_depth, leave_lane
+from .metrics import handler_started, record_handler, tracked_lock
+
+# Per-connection rate limiting: one token bucket per (sid, event)
+DEFAULT_RATE_LIMIT = (5, 10)  # tokens per second, burst capacity
+RATE_LIMITS = {
+    "register_player": (1, 3),
+    "create_room": (0.5, 3),
+    "join_room": (1, 5),
+    "join_random_room": (1, 3),
+    "leave_room": (1, 5),
+    "start_game": (1, 3),
+    "get_rooms": (2, 6),
+    "make_move": (5, 10),
+    "request_hint": (0.5, 3),
+    "reset_game": (1, 3),
+    "webrtc_offer": (2, 5),
+    "webrtc_answer": (2, 5),
+    "webrtc_candidate": (20, 50),
+    "settle_moves": (2, 5),
+    "join_lobby": (2, 5),
+    "leave_lobby": (2, 5),
+    "spectate_room": (1, 3),
+    "stop_spectating": (1, 3)
+}
+# Override budgets with e.g. RATE_LIMITS='{"make_move": [10, 20]}'
+RATE_LIMITS.update({
+    event: tuple(budget)
+    for event, budget in json.loads(os.environ.get("RATE_LIMITS", "{}")).items()
+})
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") != "0"
+
+# Largest JSON-encoded payload accepted per event, in bytes
+DEFAULT_SIZE_BUDGET = 1024
+EVENT_SIZE_BUDGETS = {
+    "register_player": 512,
+    "create_room": 512,
+    "join_room": 256,
+    "join_random_room": 256,
+    "leave_room": 256,
+    "start_game": 256,
+    "get_rooms": 256,
+    "make_move": 256,
+    "request_hint": 256,
+    "reset_game": 256,
+    "webrtc_offer": 16384,
+    "webrtc_answer": 16384,
+    "webrtc_candidate": 1024,
+    "settle_moves": 65536,
+    "join_lobby": 64,
+    "leave_lobby": 64,
+    "spectate_room": 256,
+    "stop_spectating": 256
+}
+# Override budgets with e.g. EVENT_SIZE_BUDGETS='{"webrtc_offer": 32768}'
+EVENT_SIZE_BUDGETS.update(json.loads(os.environ.get("EVENT_SIZE_BUDGETS", "{}")))
+
+rate_buckets = {}  # sid -> {event: [tokens, last_refill, throttled]}
+throttled_events = Counter()
+oversized_events = Counter()
+
+def take_token(bucket, rate, burst, now):
+    """Refill a [tokens, last_refill, ...] bucket and take one token.
+
+    Returns 0 when a token was taken, otherwise the seconds until one is due.
+    """
+    tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+    bucket[1] = now
+    if tokens >= 1:
+        bucket[0] = tokens - 1
+        return 0
+    bucket[0] = tokens
+    return (1 - tokens) / rate
+
+def consume_token(sid, event):
+    """Take one token from the sid's bucket for this event, False if empty"""
+    rate, burst = RATE_LIMITS.get(event, DEFAULT_RATE_LIMIT)
+    now = time.monotonic()
+    buckets = rate_buckets.setdefault(sid, {})
+    bucket = buckets.get(event)
+    if bucket is None:
+        bucket = buckets[event] = [burst, now, False]
+
+    wait = take_token(bucket, rate, burst, now)
+    if not wait:
+        bucket[2] = False
+        return True
+
+    throttled_events[event] += 1
+    if not bucket[2]:
+        # Tell the client once per throttled streak, then drop silently
+        bucket[2] = True
+        emit("rate_limited", {"event": event, "retry_after": round(wait, 3)})
+    return False
+
+def payload_size(data):
+    """JSON-encoded size of a payload, binary fields counted at their raw length.
+
+    Returns None for payloads JSON cannot size at all, such as binary dict keys.
+    """
+    binary = []
+
+    def size_binary(value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            binary.append(len(value))
+            return ""
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+    try:
+        return len(json.dumps(data, separators=(",", ":"), default=size_binary)) + sum(binary)
+    except (TypeError, ValueError):
+        return None
+
+def within_size_budget(event, data):
+    """False, after telling the client, if the payload exceeds the event's budget"""
+    budget = EVENT_SIZE_BUDGETS.get(event, DEFAULT_SIZE_BUDGET)
+    size = payload_size(data)
+    if size is not None and size <= budget:
+        return True
+
+    oversized_events[event] += 1
+    emit("payload_rejected", {"event": event, "size": size, "limit": budget})
+    return False
+
+def rate_limited(event):
+    """Drop the event when the calling connection is over its rate or size budget.
+
+    Events that go through wait for a slot in their priority lane and are
+    timed for the dashboard; when the lane's queue is full they are shed.
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if RATE_LIMIT_ENABLED and not consume_token(request.sid, event):
+                return None
+            if args and not within_size_budget(event, args[0]):
+                return None
+            lane = enter_lane(event)
+            if lane is None:
+                emit("server_busy", {"event": event})
+                return None
+            # A handler called from another one runs inside the caller's
+            # timing and is not counted again
+            outermost = handler_depth() == 1
+            started = handler_started(event) if outermost else None
+            try:
+                return f(*args, **kwargs)
+            finally:
+                if outermost:
+                    record_handler(started)
+                leave_lane(lane)
+        return wrapper
+    return decorator
+
+# Admission control: one global bucket shared by all connects and
+# registrations. While handshakes arrive faster than STORM_THRESHOLD per
+# second, global stats broadcasts are held back and sent once afterwards.
+ADMISSION_CONTROL_ENABLED = os.environ.get("ADMISSION_CONTROL_ENABLED", "1") != "0"
+ADMISSION_RATE = float(os.environ.get("ADMISSION_RATE", 200))  # handshakes per second
+ADMISSION_BURST = int(os.environ.get("ADMISSION_BURST", 400))
+ADMISSION_JITTER = float(os.environ.get("ADMISSION_JITTER", 3))  # seconds of random retry spread
+STORM_THRESHOLD = int(os.environ.get("STORM_THRESHOLD", 50))  # handshakes per second
+STORM_COOLDOWN = float(os.environ.get("STORM_COOLDOWN", 5))  # seconds
+
+admission_lock = tracked_lock("admission")
+admission_bucket = [ADMISSION_BURST, time.monotonic()]
+admission_window = [0, 0]  # [second, handshakes seen in that second]
+admission_stats = Counter()
+storm_until = 0.0
+
+def admit_handshake():
+    """Return 0 if a handshake may proceed, else a jittered retry-after in seconds"""
+    global storm_until
+    if not ADMISSION_CONTROL_ENABLED:
+        return 0
+
+    now = time.monotonic()
+    with admission_lock:
+        second = int(now)
+        if admission_window[0] != second:
+            admission_window[:] = [second, 0]
+        admission_window[1] += 1
+
+        wait = take_token(admission_bucket, ADMISSION_RATE, ADMISSION_BURST, now)
+        if wait or admission_window[1] >= STORM_THRESHOLD:
+            storm_until = now + STORM_COOLDOWN
+
+    if wait:
+        admission_stats["refused"] += 1
+        return round(wait + random.uniform(0, ADMISSION_JITTER), 3)
+    admission_stats["admitted"] += 1
+    return 0
+
+def in_storm():
+    return time.monotonic() < storm_until
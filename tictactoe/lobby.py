@@ -0,0 +1,99 @@
+"""Lobby stats broadcasts and batched spectator updates"""
+import os
+
+from flask_socketio import leave_room
+
+from . import directory
+from .extensions import socketio
+from .limits import admission_stats, in_storm
+from .metrics import tracked_lock
+from .rooms import game_rooms, players, waiting_players
+
+# Socket room of clients currently showing the lobby; stats go only here
+LOBBY_TOPIC = "lobby"
+
+# Spectators watch through a separate socket room that receives batched
+# deltas, so the per-move cost for players does not grow with the audience
+SPECTATOR_CAP = int(os.environ.get("SPECTATOR_CAP", 500))  # per room
+SPECTATOR_FLUSH_INTERVAL = float(os.environ.get("SPECTATOR_FLUSH_INTERVAL", 0.25))  # seconds
+
+spectator_rooms = {}  # sid -> room_id being watched
+pending_spectator_updates = {}  # room_id -> list of move deltas, None for a full resync
+spectator_lock = tracked_lock("spectator")
+stats_pending = False  # a broadcast was held back during a reconnect storm
+
+def spectator_channel(room_id):
+    return f"{room_id}:spectators"
+
+def queue_spectator_update(room, delta=None):
+    """Queue a change for the next spectator flush; no delta forces a resync"""
+    if not room.spectators:
+        return
+
+    with spectator_lock:
+        if delta is None:
+            pending_spectator_updates[room.room_id] = None
+        else:
+            deltas = pending_spectator_updates.setdefault(room.room_id, [])
+            if deltas is not None:
+                deltas.append(delta)
+
+def flush_spectator_updates():
+    """Send one coalesced frame per watched room that changed since the last flush"""
+    with spectator_lock:
+        pending = dict(pending_spectator_updates)
+        pending_spectator_updates.clear()
+
+    for room_id, deltas in pending.items():
+        room = game_rooms.get(room_id)
+        if room is None or not room.spectators:
+            continue
+
+        if deltas is None:
+            socketio.emit("spectate_snapshot", room.snapshot(), room=spectator_channel(room_id))
+        else:
+            socketio.emit("spectator_deltas", {
+                "room_id": room_id,
+                "deltas": deltas,
+                "current_player": room.game_state["current_player"],
+                "winner": room.game_state["winner"],
+                "game_active": room.game_state["game_active"],
+                "moves": room.game_state["moves"]
+            }, room=spectator_channel(room_id))
+
+def stop_spectating(sid):
+    """Detach a socket from the room it is watching, if any"""
+    room_id = spectator_rooms.pop(sid, None)
+    if room_id is None:
+        return None
+
+    room = game_rooms.get(room_id)
+    if room:
+        room.spectators.pop(sid, None)
+    leave_room(spectator_channel(room_id), sid=sid)
+    return room_id
+
+def broadcast_stats():
+    """Broadcast server statistics to lobby subscribers"""
+    global stats_pending
+    if in_storm():
+        # Coalesce into a single broadcast once the storm has passed
+        stats_pending = True
+        admission_stats["stats_suppressed"] += 1
+        return
+    stats_pending = False
+    admission_stats["stats_broadcasts"] += 1
+
+    # Only clients showing the lobby display the counters
+    socketio.emit("stats_update", stats_payload(), room=LOBBY_TOPIC)
+
+def stats_payload():
+    active_games = sum(1 for room in list(game_rooms.values()) if room.game_state["game_active"])
+    
+    # Other shards' counters, as of their last directory write
+    remote = directory.remote_counts
+    return {
+        "active_games": active_games + remote["active_games"],
+        "online_players": len(players) + remote["online_players"],
+        "waiting_players": len(waiting_players) + remote["waiting_players"]
+    }
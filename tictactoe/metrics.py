@@ -0,0 +1,153 @@
+"""Counters, latency samples and contention instrumentation for the handlers"""
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+
+logger = logging.getLogger(__name__)
+
+# Handler durations since the last dashboard tick; older samples fall off
+LATENCY_SAMPLES = int(os.environ.get("LATENCY_SAMPLES", 4096))
+
+# Contention instrumentation: wait/hold times of the shared-state locks, a
+# gauge of handlers running at once and a stack sample of any handler still
+# running after SLOW_HANDLER_MS. Off by default; when off, tracked_lock()
+# hands out plain locks and the handler hooks cost one flag check.
+INSTRUMENTATION = os.environ.get("INSTRUMENTATION", "0") != "0"
+SLOW_HANDLER_MS = float(os.environ.get("SLOW_HANDLER_MS", 250))  # 0 disables stack samples
+
+handler_latencies = deque(maxlen=LATENCY_SAMPLES)  # seconds
+game_stats = Counter()  # "moves", "events"
+
+running_handlers = {}  # thread ident -> (event, perf_counter() at start)
+handler_gauge = {"peak": 0}  # most handlers running at once since the last report
+slow_handlers = Counter()  # event -> stack samples taken
+sampled_handlers = set()  # (thread ident, start) already sampled
+lock_stats = {}  # lock name -> LockStats
+
+def handler_started(event):
+    """Mark the calling thread as running event; returns the start time"""
+    started = time.perf_counter()
+    if INSTRUMENTATION:
+        running_handlers[threading.get_ident()] = (event, started)
+        handler_gauge["peak"] = max(handler_gauge["peak"], len(running_handlers))
+    return started
+
+def record_handler(started):
+    """Record one handled event that began at perf_counter() value started"""
+    handler_latencies.append(time.perf_counter() - started)
+    game_stats["events"] += 1
+    if INSTRUMENTATION:
+        running_handlers.pop(threading.get_ident(), None)
+
+def take_latencies():
+    """Remove and return the samples recorded so far"""
+    return [handler_latencies.popleft() for _ in range(len(handler_latencies))]
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else None
+
+class LockStats:
+    """Totals for every lock created under one name; updated while it is held"""
+
+    __slots__ = ("acquisitions", "contended", "wait_total", "wait_max", "hold_total", "hold_max")
+
+    def __init__(self):
+        self.acquisitions = self.contended = 0
+        self.wait_total = self.wait_max = self.hold_total = self.hold_max = 0.0
+
+    def report(self):
+        return {
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "wait_ms_total": round(self.wait_total * 1000, 3),
+            "wait_ms_max": round(self.wait_max * 1000, 3),
+            "hold_ms_total": round(self.hold_total * 1000, 3),
+            "hold_ms_max": round(self.hold_max * 1000, 3)
+        }
+
+class InstrumentedLock:
+    """threading.Lock stand-in that records acquire wait and hold times"""
+
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.stats = lock_stats.setdefault(name, LockStats())
+        self.acquired_at = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self.lock.acquire(False):
+            wait = 0.0
+        else:
+            if not blocking:
+                return False
+            start = time.perf_counter()
+            if not self.lock.acquire(True, timeout):
+                return False
+            wait = time.perf_counter() - start
+            self.stats.contended += 1
+        stats = self.stats
+        stats.acquisitions += 1
+        stats.wait_total += wait
+        stats.wait_max = max(stats.wait_max, wait)
+        self.acquired_at = time.perf_counter()
+        return True
+
+    def release(self):
+        hold = time.perf_counter() - self.acquired_at
+        stats = self.stats
+        stats.hold_total += hold
+        stats.hold_max = max(stats.hold_max, hold)
+        self.lock.release()
+
+    def locked(self):
+        return self.lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+def tracked_lock(name):
+    """A lock for shared state, instrumented under name when INSTRUMENTATION is on"""
+    return InstrumentedLock(name) if INSTRUMENTATION else threading.Lock()
+
+def sample_slow_handlers():
+    """Log the stack of every handler past SLOW_HANDLER_MS, once per call"""
+    now = time.perf_counter()
+    frames = None
+    for ident, (event, started) in list(running_handlers.items()):
+        elapsed_ms = (now - started) * 1000
+        if elapsed_ms < SLOW_HANDLER_MS or (ident, started) in sampled_handlers:
+            continue
+        frames = frames or sys._current_frames()
+        frame = frames.get(ident)
+        if frame is None:
+            continue
+        sampled_handlers.add((ident, started))
+        slow_handlers[event] += 1
+        stack = "".join(traceback.format_stack(frame))
+        logger.warning(f"Slow handler {event}: {elapsed_ms:.0f} ms and still running\n{stack}")
+
+    live = {(ident, started) for ident, (_, started) in list(running_handlers.items())}
+    sampled_handlers.intersection_update(live)
+
+def instrumentation_report(reset_peak=False):
+    peak = handler_gauge["peak"]
+    if reset_peak:
+        handler_gauge["peak"] = len(running_handlers)
+    report = {
+        "enabled": INSTRUMENTATION,
+        "threads": threading.active_count(),
+        "handlers_running": len(running_handlers),
+        "handlers_peak": peak
+    }
+    if INSTRUMENTATION:
+        report.update(
+            slow_handlers=dict(slow_handlers),
+            locks={name: stats.report() for name, stats in sorted(lock_stats.items())}
+        )
+    return report
@@ -0,0 +1,488 @@
+"""Game rooms, the room and player registries and the lobby search indexes"""
+import base64
+import bisect
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from collections import Counter, OrderedDict
+
+from .metrics import tracked_lock
+
+logger = logging.getLogger(__name__)
+
+# Board variants: name -> (board size, run length needed to win)
+BOARD_VARIANTS = {
+    "classic": (3, 3),
+    "connect4x4": (4, 4),
+    "gomoku": (15, 5)
+}
+
+# Peer-to-peer rooms: clients settle their move log at least this often
+P2P_CHECKPOINT_MOVES = int(os.environ.get("P2P_CHECKPOINT_MOVES", 10))
+
+# Retried actions (same client action_id) within the last ACTION_DEDUPE_WINDOW
+# actions of a room get the original result back instead of being reapplied
+ACTION_DEDUPE_WINDOW = int(os.environ.get("ACTION_DEDUPE_WINDOW", 32))
+duplicate_actions = Counter()  # event -> retries answered from the window
+
+# Store game rooms and players
+game_rooms = {}
+players = {}
+waiting_players = []
+player_rooms = {}  # player_id -> room_id of the room they are seated in
+player_seat_counts = Counter()  # player_id -> number of rooms they hold a seat in
+
+class Equivocation(ValueError):
+    """A player signed two different moves for the same place in the chain"""
+
+    def __init__(self, message, player_id):
+        super().__init__(message)
+        self.player_id = player_id
+
+class GameRoom:
+    def __init__(self, room_id, variant="classic", p2p=False):
+        self.room_id = room_id
+        self.variant = variant
+        self.p2p = p2p
+        self.move_keys = {}  # player_id -> secret used to sign their moves
+        self.chain_head = None
+        self.settled_hashes = []  # chain hash of each settled move, by seq - 1
+        self.size, self.run = BOARD_VARIANTS[variant]
+        self.players = {}  # player_id -> player_info
+        self.spectators = {}  # sid -> spectator name
+        self.recent_actions = OrderedDict()  # (player_id, action_id) -> (event, payload)
+        self.action_lock = tracked_lock("room_action")  # held across recall, apply and remember
+        self.game_state = {
+            'board': [None] * (self.size * self.size),
+            'current_player': None,
+            'game_active': False,
+            'winner': None,
+            'moves': 0
+        }
+        self.created_at = time.time()
+        self.last_activity = time.time()
+    
+    def add_player(self, player_id, player_info):
+        if len(self.players) < 2:
+            if player_id not in self.players:
+                player_seat_counts[player_id] += 1  # Rejoining your own room takes no new seat
+            self.players[player_id] = player_info
+            player_rooms[player_id] = self.room_id
+            self.last_activity = time.time()
+            index_room(self)
+            return True
+        return False
+    
+    def remove_player(self, player_id):
+        """Unseat a player; returns True if that abandoned a game, which is cleared"""
+        if player_id not in self.players:
+            return False
+        del self.players[player_id]
+        if player_rooms.get(player_id) == self.room_id:
+            del player_rooms[player_id]
+        release_seat(player_id)
+        abandoned = self.game_state['game_active'] or self.game_state['moves'] > 0
+        if abandoned:
+            # No game can go on without its opponent; the next pair starts clean
+            self.reset_game()
+        self.last_activity = time.time()
+        index_room(self)
+        return abandoned
+
+    def recall_action(self, player_id, action_id):
+        """(event, payload) an already applied action produced, or None"""
+        if not isinstance(action_id, (str, int)):
+            return None
+        return self.recent_actions.get((player_id, action_id))
+
+    def remember_action(self, player_id, action_id, event, payload):
+        if not isinstance(action_id, (str, int)):
+            return
+        self.recent_actions[(player_id, action_id)] = (event, payload)
+        if len(self.recent_actions) > ACTION_DEDUPE_WINDOW:
+            self.recent_actions.popitem(last=False)
+
+    def peer_of(self, player_id):
+        for pid, info in self.players.items():
+            if pid != player_id:
+                return info
+        return None
+    
+    def is_full(self):
+        return len(self.players) >= 2
+    
+    def is_empty(self):
+        return len(self.players) == 0
+    
+    def get_player_list(self):
+        return list(self.players.keys())
+    
+    def reset_game(self):
+        self.game_state = {
+            'board': [None] * (self.size * self.size),
+            'current_player': None,
+            'game_active': False,
+            'winner': None,
+            'moves': 0
+        }
+        self.settled_hashes = []
+        self.last_activity = time.time()
+        index_room(self)
+
+    def start_game(self):
+        if len(self.players) == 2:
+            if self.game_state['moves'] or self.game_state['winner']:
+                self.reset_game()  # Restarting a finished game without a reset first
+            self.game_state['game_active'] = True
+            player_ids = list(self.players.keys())
+            self.game_state['current_player'] = player_ids[0]  # First player goes first
+            if self.p2p:
+                self.move_keys = {pid: secrets.token_hex(16) for pid in player_ids}
+                self.chain_head = secrets.token_hex(16)
+                self.settled_hashes = []
+            self.last_activity = time.time()
+            index_room(self)
+            return True
+        return False
+
+    def reset_payload(self):
+        return {
+            'room_id': self.room_id,
+            'board': list(self.game_state['board']),
+            'game_active': self.game_state['game_active']
+        }
+
+    def start_payload(self, player_id):
+        """game_started fields for one player, including their signing key"""
+        index = self.get_player_list().index(player_id)
+        payload = {
+            'room_id': self.room_id,
+            'symbol': 'X' if index == 0 else 'O',
+            'your_turn': index == 0,  # First player goes first
+            'is_host': index == 0  # First player is host for WebRTC
+        }
+        if self.p2p and player_id in self.move_keys:
+            payload.update(
+                p2p=True,
+                move_key=self.move_keys[player_id],
+                chain_head=self.chain_head,
+                checkpoint_moves=P2P_CHECKPOINT_MOVES
+            )
+        return payload
+
+    def make_move(self, player_id, index):
+        """Play one server-authoritative move and return the mover's symbol.
+
+        Raises ValueError with a message for the player if the move is not
+        legal; the game state is untouched in that case.
+        """
+        state = self.game_state
+        if not state['game_active']:
+            raise ValueError("Game not active")
+        if state['current_player'] != player_id:
+            raise ValueError("Not your turn")
+        if type(index) is not int or not 0 <= index < len(state['board']):
+            raise ValueError("Invalid cell")
+        if state['board'][index] is not None:
+            raise ValueError("Cell already occupied")
+
+        player_list = self.get_player_list()
+        symbol = 'X' if player_list[0] == player_id else 'O'
+        state['board'][index] = symbol
+        state['moves'] += 1
+        if self.chain_head is not None:
+            # Keep the chain intact for peer-to-peer rooms falling back to the server
+            self.chain_head = chain_hash(self.chain_head, state['moves'], index, symbol)
+            self.settled_hashes.append(self.chain_head)
+
+        # Switch turns
+        state['current_player'] = player_list[(player_list.index(player_id) + 1) % 2]
+
+        # Check for winner along the lines through the new mark only
+        winner = check_winner_at(state['board'], self.size, self.run, index)
+        if winner or state['moves'] >= len(state['board']):
+            state['winner'] = winner or 'tie'
+            state['game_active'] = False
+            state['current_player'] = None
+            index_room(self)
+        self.last_activity = time.time()
+        return symbol
+
+    def apply_move_log(self, entries):
+        """Validate a peer-to-peer move log and apply the unsettled part.
+
+        Every entry must extend the hash chain from the last settled move,
+        carry the mover's signature and be legal on the current board.
+        Entries already settled must match the settled chain; a different
+        move its player signed for the same seq raises Equivocation. Nothing
+        is applied unless the whole log checks out. Returns the entries that
+        were applied; raises ValueError otherwise.
+        """
+        state = self.game_state
+        board = list(state['board'])
+        moves = state['moves']
+        current = state['current_player']
+        winner = state['winner']
+        head = self.chain_head
+        player_list = self.get_player_list()
+        hashes = []
+        applied = []
+
+        for entry in entries:
+            seq = entry['seq']
+            if type(seq) is not int or seq < 1:
+                raise ValueError("Move log entry without a valid seq")
+            if seq <= state['moves']:
+                # Already settled by the other player or a checkpoint
+                if entry['hash'] != self.settled_hashes[seq - 1]:
+                    self.check_equivocation(entry)
+                    raise ValueError(f"Move {seq} does not match the settled chain")
+                continue
+            if seq != moves + 1:
+                raise ValueError(f"Move {moves + 1} missing from log")
+            if current is None or winner:
+                raise ValueError(f"Move {seq} made after the game ended")
+
+            index = entry['index']
+            symbol = 'X' if current == player_list[0] else 'O'
+            if entry['symbol'] != symbol:
+                raise ValueError(f"Move {seq} played out of turn")
+            if not isinstance(index, int) or not 0 <= index < len(board) or board[index] is not None:
+                raise ValueError(f"Move {seq} is not a legal cell")
+
+            expected = chain_hash(head, seq, index, symbol)
+            if entry['hash'] != expected:
+                raise ValueError(f"Move {seq} breaks the hash chain")
+            if not hmac.compare_digest(str(entry['sig']), sign_move(self.move_keys[current], expected)):
+                raise ValueError(f"Move {seq} has a bad signature")
+
+            board[index] = symbol
+            moves += 1
+            head = expected
+            hashes.append(expected)
+            applied.append(entry)
+
+            winner = check_winner_at(board, self.size, self.run, index)
+            if not winner and moves >= len(board):
+                winner = 'tie'
+            current = None if winner else player_list[(player_list.index(current) + 1) % 2]
+
+        if not applied:
+            return applied  # Nothing new; an unstarted or reset room stays as it is
+
+        state['board'] = board
+        state['moves'] = moves
+        state['current_player'] = current
+        state['winner'] = winner
+        state['game_active'] = not winner
+        self.chain_head = head
+        self.settled_hashes.extend(hashes)
+        self.last_activity = time.time()
+        index_room(self)
+        return applied
+
+    def check_equivocation(self, entry):
+        """Raise Equivocation if a conflicting settled-seq entry carries its mover's signature"""
+        signer = dict(zip('XO', self.get_player_list())).get(entry['symbol'])
+        key = self.move_keys.get(signer)
+        if key and hmac.compare_digest(str(entry['sig']), sign_move(key, str(entry['hash']))):
+            raise Equivocation(f"Move {entry['seq']} was signed twice by {signer}", signer)
+
+    def snapshot(self):
+        return {
+            'room_id': self.room_id,
+            'room_name': f"Room {self.room_id}",
+            'variant': self.variant,
+            'size': self.size,
+            'run': self.run,
+            'players': [{'id': pid, 'name': info['name']} for pid, info in self.players.items()],
+            'board': self.game_state['board'],
+            'current_player': self.game_state['current_player'],
+            'winner': self.game_state['winner'],
+            'game_active': self.game_state['game_active'],
+            'moves': self.game_state['moves']
+        }
+
+    def to_dict(self):
+        return {
+            'room_id': self.room_id,
+            'variant': self.variant,
+            'players': list(self.players.keys()),
+            'game_state': dict(self.game_state, board=list(self.game_state['board'])),
+            'p2p': self.p2p,
+            'move_keys': self.move_keys,
+            'chain_head': self.chain_head,
+            'settled_hashes': self.settled_hashes,
+            'created_at': self.created_at,
+            'last_activity': self.last_activity
+        }
+
+    @classmethod
+    def from_dict(cls, data, player_registry):
+        room = cls(data['room_id'], data.get('variant', 'classic'), data.get('p2p', False))
+        room.move_keys = data.get('move_keys', {})
+        room.chain_head = data.get('chain_head')
+        room.settled_hashes = data.get('settled_hashes', [])
+        for pid in data['players']:
+            if pid in player_registry:
+                room.players[pid] = player_registry[pid]
+                player_rooms[pid] = room.room_id
+                player_seat_counts[pid] += 1
+        room.game_state = data['game_state']
+        room.created_at = data['created_at']
+        room.last_activity = data['last_activity']
+        return room
+
+# Secondary indexes over game_rooms for the lobby search: (state, variant) ->
+# [(created_at, room_id)] kept sorted, with None standing for "any" in either
+# slot, so every filter combination is a bisect plus a slice
+ROOM_STATES = ("open", "full", "in_progress")
+ROOM_PAGE_SIZE = int(os.environ.get("ROOM_PAGE_SIZE", 20))
+MAX_ROOM_PAGE_SIZE = 100
+room_indexes = {}
+indexed_room_states = {}  # room_id -> state the room is filed under
+room_index_lock = tracked_lock("room_index")
+
+def room_state(room):
+    if room.game_state['game_active']:
+        return "in_progress"
+    return "full" if room.is_full() else "open"
+
+def _drop_index_entry(key, entry):
+    entries = room_indexes.get(key, [])
+    i = bisect.bisect_left(entries, entry)
+    if i < len(entries) and entries[i] == entry:
+        del entries[i]
+
+def index_room(room):
+    """File a registered room under its current state"""
+    if game_rooms.get(room.room_id) is not room:
+        return
+    state = room_state(room)
+    entry = (room.created_at, room.room_id)
+    with room_index_lock:
+        previous = indexed_room_states.get(room.room_id)
+        if previous == state:
+            return
+        if previous is None:
+            keys = [(state, room.variant), (state, None), (None, room.variant), (None, None)]
+        else:
+            _drop_index_entry((previous, room.variant), entry)
+            _drop_index_entry((previous, None), entry)
+            keys = [(state, room.variant), (state, None)]
+        for key in keys:
+            bisect.insort(room_indexes.setdefault(key, []), entry)
+        indexed_room_states[room.room_id] = state
+
+def unindex_room(room):
+    entry = (room.created_at, room.room_id)
+    with room_index_lock:
+        state = indexed_room_states.pop(room.room_id, None)
+        if state is None:
+            return
+        for key in ((state, room.variant), (state, None), (None, room.variant), (None, None)):
+            _drop_index_entry(key, entry)
+
+def register_room(room):
+    game_rooms[room.room_id] = room
+    index_room(room)
+
+def remove_room(room_id):
+    """Drop a room from game_rooms, its indexes and the player_rooms index"""
+    room = game_rooms.pop(room_id, None)
+    if room is None:
+        return None
+    unindex_room(room)
+    for pid in room.players:
+        if player_rooms.get(pid) == room_id:
+            del player_rooms[pid]
+        release_seat(pid)
+    return room
+
+def release_seat(player_id):
+    player_seat_counts[player_id] -= 1
+    if player_seat_counts[player_id] <= 0:
+        del player_seat_counts[player_id]
+
+def encode_room_cursor(entry):
+    if entry is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(entry)).encode()).decode()
+
+def decode_room_cursor(cursor):
+    """Raises ValueError for anything encode_room_cursor did not produce"""
+    if cursor is None:
+        return None
+    try:
+        created_at, room_id = json.loads(base64.urlsafe_b64decode(str(cursor).encode()))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from None
+    if not isinstance(created_at, (int, float)) or not isinstance(room_id, str):
+        raise ValueError("Invalid cursor")
+    return (created_at, room_id)
+
+def search_rooms(state=None, variant=None, limit=ROOM_PAGE_SIZE, after=None):
+    """One page of room ids in creation order, the cursor of the next page and the match count"""
+    with room_index_lock:
+        entries = room_indexes.get((state, variant), [])
+        start = bisect.bisect_right(entries, after) if after is not None else 0
+        page = entries[start:start + limit]
+        total = len(entries)
+    next_entry = page[-1] if page and start + limit < total else None
+    return [room_id for _, room_id in page], next_entry, total
+
+def check_winner(board, size=3, run=3):
+    """Check if there's a winner anywhere on the board"""
+    for index in range(len(board)):
+        winner = check_winner_at(board, size, run, index)
+        if winner:
+            return winner
+    return None
+
+def chain_hash(prev_hash, seq, index, symbol):
+    """Link one move to the previous one in a room's move chain"""
+    return hashlib.sha256(f"{prev_hash}|{seq}|{index}|{symbol}".encode()).hexdigest()
+
+def sign_move(key, move_hash):
+    return hmac.new(key.encode(), move_hash.encode(), hashlib.sha256).hexdigest()
+
+def check_winner_at(board, size, run, index):
+    """Check whether the mark at index completes a run of the given length.
+
+    Only the row, column and two diagonals through index are walked, so the
+    cost per move is O(run) regardless of board size.
+    """
+    symbol = board[index]
+    if symbol is None:
+        return None
+
+    row, col = divmod(index, size)
+    for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        count = 1
+        for step in (1, -1):
+            r, c = row + d_row * step, col + d_col * step
+            while 0 <= r < size and 0 <= c < size and board[r * size + c] == symbol:
+                count += 1
+                r += d_row * step
+                c += d_col * step
+        if count >= run:
+            return symbol
+    return None
+
+def cleanup_old_rooms(keep=()):
+    """Clean up old inactive rooms, except the room ids in keep"""
+    current_time = time.time()
+    rooms_to_remove = []
+    
+    for room_id, room in list(game_rooms.items()):
+        # Remove rooms inactive for more than 30 minutes
+        if current_time - room.last_activity > 1800 and room_id not in keep:  # 30 minutes
+            rooms_to_remove.append(room_id)
+    
+    for room_id in rooms_to_remove:
+        remove_room(room_id)
+        logger.info(f"Cleaned up old room: {room_id}")
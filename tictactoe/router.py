@@ -0,0 +1,78 @@
+"""Front router for the sharded launcher.
+
+Every HTTP request and websocket is passed through byte for byte to one
+worker process, chosen on the consistent-hash ring from the `room` query
+parameter the client sends after migrating into a room, else its `player`
+parameter, else its address. Polling requests are forced to
+Connection: close so a reused keep-alive connection can never carry a
+request to the wrong worker.
+"""
+import asyncio
+import logging
+from collections import Counter
+from urllib.parse import parse_qs, urlsplit
+
+from .sharding import HashRing
+
+logger = logging.getLogger(__name__)
+
+BAD_GATEWAY = b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+
+class ShardRouter:
+    def __init__(self, backends):
+        self.backends = backends  # shard index -> (host, port)
+        self.ring = HashRing(len(backends))
+        self.routed = Counter()  # shard index -> connections
+
+    def shard_for(self, target, peer):
+        query = parse_qs(urlsplit(target).query)
+        for param in ("room", "player"):
+            value = query.get(param, [""])[0]
+            if value:
+                return self.ring.owner(value)
+        return self.ring.owner(peer[0] if peer else "")
+
+    async def handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request_line, _, header_block = head.partition(b"\r\n")
+            _, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            writer.close()
+            return
+
+        headers = [line for line in header_block.split(b"\r\n") if line]
+        if not any(line.lower().startswith(b"upgrade:") for line in headers):
+            headers = [
+                line for line in headers
+                if not line.lower().startswith((b"connection:", b"keep-alive:"))
+            ] + [b"Connection: close"]
+
+        shard = self.shard_for(target, writer.get_extra_info("peername"))
+        try:
+            backend_reader, backend_writer = await asyncio.open_connection(*self.backends[shard])
+        except OSError as e:
+            logger.warning(f"Shard {shard} unreachable: {e}")
+            writer.write(BAD_GATEWAY)
+            writer.close()
+            return
+
+        self.routed[shard] += 1
+        backend_writer.write(b"\r\n".join([request_line, *headers]) + b"\r\n\r\n")
+        await asyncio.gather(pipe(reader, backend_writer), pipe(backend_reader, writer))
+
+async def pipe(reader, writer):
+    try:
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        # Closing one direction ends the other once its read sees EOF
+        writer.close()
+
+async def serve(router, host, port):
+    server = await asyncio.start_server(router.handle, host, port)
+    logger.info(f"Router listening on {host}:{port} for {len(router.backends)} shards")
+    return server
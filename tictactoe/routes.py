@@ -0,0 +1,234 @@
+"""HTTP routes: the game page, status, health and admin endpoints"""
+import hmac
+import json
+import os
+import time
+import uuid
+
+from flask import Blueprint, Response, render_template, request
+
+from .capacity import capacity_report
+from .dashboard import dashboard_stream
+from .directory import directory_report
+from .drain import DRAIN_TIMEOUT, active_game_count, drain_state, start_drain
+from .extensions import SOCKETIO_CLIENT_URLS, WIRE_PROTOCOL
+from .hints import hint_report
+from .lanes import lane_report
+from .limits import admission_stats, in_storm, oversized_events, throttled_events
+from .lobby import broadcast_stats, spectator_rooms
+from .metrics import instrumentation_report
+from .rooms import (
+    BOARD_VARIANTS, ROOM_STATES, duplicate_actions, game_rooms, player_rooms, players, room_state,
+    search_rooms, waiting_players
+)
+from .tournaments import Tournament, start_tournament_round, tournaments
+
+bp = Blueprint("main", __name__)
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")  # unset: admin endpoints answer loopback only
+
+# Records per chunk of the NDJSON dumps; memory use is bounded by one chunk
+STATUS_DUMP_CHUNK = int(os.environ.get("STATUS_DUMP_CHUNK", 500))
+PLAYER_STATES = ("connected", "disconnected", "waiting", "seated")
+
+def admin_authorized():
+    if ADMIN_TOKEN:
+        return hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN)
+    return request.remote_addr in ("127.0.0.1", "::1")
+
+@bp.route("/")
+def index():
+    return render_template(
+        "index.html",
+        socketio_client_url=SOCKETIO_CLIENT_URLS.get(WIRE_PROTOCOL, SOCKETIO_CLIENT_URLS["json"])
+    )
+
+@bp.route("/status")
+def status():
+    return {
+        "status": "draining" if drain_state["draining"] else "running",
+        "rooms": len(game_rooms),
+        "players": len(players),
+        "waiting_players": len(waiting_players),
+        "throttled_events": dict(throttled_events),
+        "oversized_events": dict(oversized_events),
+        "duplicate_actions": dict(duplicate_actions),
+        "spectators": len(spectator_rooms),
+        "spectated_rooms": len(set(spectator_rooms.values())),
+        "admission": dict(admission_stats, storm=in_storm()),
+        "capacity": capacity_report(),
+        "hints": hint_report(),
+        "instrumentation": instrumentation_report(),
+        "lanes": lane_report(),
+        "directory": directory_report()
+    }
+
+def idle_filter():
+    """Seconds from the idle query parameter; raises ValueError if malformed"""
+    idle = request.args.get("idle")
+    if idle is None:
+        return None
+    idle = float(idle)
+    if not idle >= 0:
+        raise ValueError(idle)
+    return idle
+
+def ndjson(chunks):
+    return Response(chunks, mimetype="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
+def room_records(state, variant, idle):
+    """NDJSON chunks of matching rooms, walking the room index a page at a time"""
+    after = None
+    while True:
+        room_ids, after, _ = search_rooms(state, variant, STATUS_DUMP_CHUNK, after)
+        now = time.time()
+        lines = []
+        for room in map(game_rooms.get, room_ids):
+            if room is None or (idle is not None and now - room.last_activity < idle):
+                continue  # closed since the page was taken, or busy
+            record = dict(
+                room.snapshot(),
+                state=room_state(room),
+                p2p=room.p2p,
+                spectators=len(room.spectators),
+                created_at=room.created_at,
+                idle_seconds=round(now - room.last_activity, 1)
+            )
+            lines.append(json.dumps(record) + "\n")
+        if lines:
+            yield "".join(lines)
+        if after is None:
+            return
+
+def player_records(state, idle):
+    """NDJSON chunks of matching players.
+
+    players has no ordering to page through, so this walks a tuple of its
+    keys: one pointer per player, never the records themselves. A player's
+    idle time is that of their room; players without a room never match idle.
+    """
+    player_ids = tuple(players)
+    waiting = set(waiting_players) if state == "waiting" else None
+    for start in range(0, len(player_ids), STATUS_DUMP_CHUNK):
+        now = time.time()
+        lines = []
+        for player_id in player_ids[start:start + STATUS_DUMP_CHUNK]:
+            info = players.get(player_id)
+            if info is None:
+                continue
+            room = game_rooms.get(player_rooms.get(player_id))
+            connected = info.get("sid") is not None
+            if (state == "connected" and not connected or state == "disconnected" and connected
+                    or state == "waiting" and player_id not in waiting
+                    or state == "seated" and room is None):
+                continue
+            if idle is not None and (room is None or now - room.last_activity < idle):
+                continue
+            record = {
+                "player_id": player_id,
+                "name": info["name"],
+                "connected": connected,
+                "room_id": room.room_id if room else None,
+                "connected_at": info.get("connected_at"),
+                "resume_deadline": info.get("resume_deadline")
+            }
+            lines.append(json.dumps(record) + "\n")
+        if lines:
+            yield "".join(lines)
+
+@bp.route("/status/rooms")
+def status_rooms():
+    if not admin_authorized():
+        return {"error": "Forbidden"}, 403
+    state = request.args.get("state")
+    variant = request.args.get("variant")
+    if state is not None and state not in ROOM_STATES or variant is not None and variant not in BOARD_VARIANTS:
+        return {"error": "Invalid room filter"}, 400
+    try:
+        idle = idle_filter()
+    except ValueError:
+        return {"error": "Invalid idle filter"}, 400
+    return ndjson(room_records(state, variant, idle))
+
+@bp.route("/status/players")
+def status_players():
+    if not admin_authorized():
+        return {"error": "Forbidden"}, 403
+    state = request.args.get("state")
+    if state is not None and state not in PLAYER_STATES:
+        return {"error": "Invalid player filter"}, 400
+    try:
+        idle = idle_filter()
+    except ValueError:
+        return {"error": "Invalid idle filter"}, 400
+    return ndjson(player_records(state, idle))
+
+@bp.route("/health")
+def health():
+    if drain_state["handed_off"]:
+        return {"status": "drained"}, 503
+    if drain_state["draining"]:
+        return {"status": "draining", "games_in_progress": active_game_count()}, 503
+    return {"status": "healthy"}
+
+@bp.route("/admin/drain", methods=["POST"])
+def admin_drain():
+    if not admin_authorized():
+        return {"error": "Forbidden"}, 403
+    data = request.get_json(silent=True) or {}
+    try:
+        timeout = int(data.get("timeout", DRAIN_TIMEOUT))
+    except (TypeError, ValueError):
+        return {"error": "Invalid timeout"}, 400
+    start_drain(timeout)
+    return {
+        "status": "draining",
+        "deadline": drain_state["deadline"],
+        "games_in_progress": active_game_count()
+    }, 202
+
+@bp.route("/admin")
+def admin_dashboard():
+    return render_template("admin.html")
+
+@bp.route("/admin/stream")
+def admin_stream():
+    if not admin_authorized():
+        return {"error": "Forbidden"}, 403
+    return Response(
+        dashboard_stream.subscribe(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@bp.route("/tournaments", methods=["POST"])
+def create_tournament():
+    if not admin_authorized():
+        return {"error": "Forbidden"}, 403
+    if drain_state["draining"]:
+        return {"error": "Server is shutting down"}, 503
+    data = request.get_json(silent=True) or {}
+    player_ids = data.get("player_ids") or []
+    unknown = [pid for pid in player_ids if pid not in players]
+    seated = [pid for pid in player_ids if pid in player_rooms]
+
+    if len(player_ids) < 2 or len(set(player_ids)) != len(player_ids):
+        return {"error": "Need at least 2 distinct players"}, 400
+    if unknown:
+        return {"error": "Players not registered", "player_ids": unknown}, 400
+    if seated:
+        return {"error": "Players already seated in a room", "player_ids": seated}, 409
+
+    tournament_id = str(uuid.uuid4())[:8]
+    tournament = Tournament(tournament_id, data.get("name") or f"Tournament {tournament_id}", player_ids)
+    tournaments[tournament_id] = tournament
+    start_tournament_round(tournament, list(player_ids))
+    broadcast_stats()
+    return tournament.status(), 201
+
+@bp.route("/tournaments/<tournament_id>")
+def tournament_status(tournament_id):
+    tournament = tournaments.get(tournament_id)
+    if tournament is None:
+        return {"error": "Tournament not found"}, 404
+    return tournament.status()
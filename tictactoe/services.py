@@ -0,0 +1,122 @@
+"""Background threads, started lazily once per process"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from . import lobby
+from .capacity import CAPACITY_CHECK_INTERVAL, check_memory_pressure
+from .dashboard import DASHBOARD_INTERVAL, publish_frame
+from .directory import DIRECTORY_ENABLED, DIRECTORY_INTERVAL, sync_directory, withdraw_directory
+from .drain import drain_state
+from .limits import in_storm
+from .lobby import SPECTATOR_FLUSH_INTERVAL, broadcast_stats, flush_spectator_updates
+from .metrics import INSTRUMENTATION, SLOW_HANDLER_MS, sample_slow_handlers
+from .rooms import cleanup_old_rooms
+from .sessions import expire_disconnected_players
+from .signaling import CANDIDATE_BATCH_WINDOW, flush_candidates, pending_candidates
+from .snapshot import SNAPSHOT_INTERVAL, load_snapshot, save_snapshot
+from .tournaments import tournament_rooms
+
+logger = logging.getLogger(__name__)
+
+services_lock = threading.Lock()
+services_pid = None  # process the threads below were started in
+
+# Periodic cleanup
+def periodic_cleanup():
+    while True:
+        time.sleep(600)  # Run every 10 minutes
+        # A bracket room only ends through its match, or the tournament stalls
+        cleanup_old_rooms(keep=tournament_rooms)
+
+def periodic_spectator_flush():
+    while True:
+        time.sleep(SPECTATOR_FLUSH_INTERVAL)
+        flush_spectator_updates()
+
+def periodic_candidate_flush():
+    while True:
+        time.sleep(CANDIDATE_BATCH_WINDOW)
+        if pending_candidates:
+            flush_candidates()
+
+def periodic_session_expiry():
+    while True:
+        time.sleep(5)
+        expire_disconnected_players()
+
+def periodic_admission_tick():
+    while True:
+        time.sleep(1)
+        if lobby.stats_pending and not in_storm():
+            broadcast_stats()
+
+def periodic_capacity_check():
+    while True:
+        time.sleep(CAPACITY_CHECK_INTERVAL)
+        check_memory_pressure()
+
+def periodic_dashboard_frame():
+    while True:
+        time.sleep(DASHBOARD_INTERVAL)
+        publish_frame()
+
+def periodic_slow_handler_check():
+    while True:
+        time.sleep(SLOW_HANDLER_MS / 2000)
+        sample_slow_handlers()
+
+def periodic_directory_sync():
+    while True:
+        # A draining shard takes no new players, so peers stop listing it
+        if drain_state["draining"]:
+            withdraw_directory()
+        else:
+            sync_directory()
+        time.sleep(DIRECTORY_INTERVAL)
+
+def periodic_snapshot():
+    while True:
+        time.sleep(SNAPSHOT_INTERVAL)
+        save_snapshot()
+
+def start_background_services():
+    """Restore the snapshot and start the periodic threads, once per process.
+
+    Runs on the first request or connection rather than at import: threads do
+    not survive a fork, so a gunicorn --preload master must not start them
+    and each worker starts its own set instead.
+    """
+    global services_pid
+    if services_pid == os.getpid():
+        return
+
+    with services_lock:
+        if services_pid == os.getpid():
+            return
+
+        load_snapshot()
+        loops = [
+            periodic_cleanup,
+            periodic_spectator_flush,
+            periodic_candidate_flush,
+            periodic_session_expiry,
+            periodic_admission_tick,
+            periodic_capacity_check,
+            periodic_dashboard_frame
+        ]
+        if INSTRUMENTATION and SLOW_HANDLER_MS > 0:
+            loops.append(periodic_slow_handler_check)
+        if DIRECTORY_ENABLED:
+            loops.append(periodic_directory_sync)
+            atexit.register(withdraw_directory)
+        if SNAPSHOT_INTERVAL > 0:
+            loops.append(periodic_snapshot)
+            atexit.register(save_snapshot)
+        for loop in loops:
+            threading.Thread(target=loop, daemon=True).start()
+
+        services_pid = os.getpid()
+        logger.info(f"Background services started in process {services_pid}")
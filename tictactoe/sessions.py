@@ -0,0 +1,71 @@
+"""Seat holding and resumption for players who lose their connection"""
+import logging
+import os
+import time
+
+from .extensions import socketio
+from .lobby import broadcast_stats
+from .rooms import game_rooms, player_rooms, players, remove_room
+from .tournaments import forfeit_tournament_match
+
+logger = logging.getLogger(__name__)
+
+# Session resumption: a disconnected player's seat is held for a grace period
+# and rebound when they register again with their session token
+RECONNECT_GRACE_PERIOD = int(os.environ.get("RECONNECT_GRACE_PERIOD", 60))  # seconds, 0 disables
+
+migrating_sids = set()  # sockets sent to another shard; their seats are released, not held
+
+def find_player_room(player_id):
+    """Room the player is seated in, via the player_rooms index"""
+    room = game_rooms.get(player_rooms.get(player_id))
+    if room is not None and player_id in room.players:
+        return room
+    return None
+
+def hold_player_seat(player_id, window):
+    """Detach the player's socket but keep them registered and seated"""
+    player_info = players[player_id]
+    player_info["sid"] = None
+    player_info["resume_deadline"] = time.time() + window
+
+    room = find_player_room(player_id)
+    if room is not None:
+        socketio.emit("player_disconnected", {
+            "player_id": player_id,
+            "grace_period": window
+        }, room=room.room_id)
+
+def release_player(player_id):
+    """Remove a player from their room and from the registry"""
+    room = find_player_room(player_id)
+    if room is not None:
+        room_id = room.room_id
+        abandoned = room.remove_player(player_id)
+        socketio.emit("player_left", {"player_id": player_id}, room=room_id)
+        if abandoned and not room.is_empty():
+            socketio.emit("game_reset", room.reset_payload(), room=room_id)
+
+        # Remove empty rooms
+        if room.is_empty():
+            remove_room(room_id)
+            logger.info(f"Removed empty room: {room_id}")
+        forfeit_tournament_match(room_id, player_id)
+
+    player_rooms.pop(player_id, None)
+    players.pop(player_id, None)
+
+def expire_disconnected_players():
+    """Release players whose reconnect grace period has run out"""
+    now = time.time()
+    expired = [
+        player_id for player_id, player_info in list(players.items())
+        if player_info.get("sid") is None and player_info.get("resume_deadline", 0) < now
+    ]
+
+    for player_id in expired:
+        release_player(player_id)
+        logger.info(f"Player {player_id} did not reconnect in time")
+
+    if expired:
+        broadcast_stats()
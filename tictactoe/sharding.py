@@ -0,0 +1,45 @@
+"""Consistent-hash placement of rooms across the worker processes of one host.
+
+The launcher starts SHARD_COUNT copies of the server, each with its own
+SHARD_INDEX, and the front router sends every socket to the process that
+owns its room. With the default SHARD_COUNT of 1 every room is local.
+"""
+import bisect
+import hashlib
+import os
+import uuid
+
+SHARD_INDEX = int(os.environ.get("SHARD_INDEX", 0))
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT", 1))
+RING_REPLICAS = 64  # virtual nodes per shard
+
+def ring_point(key):
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+class HashRing:
+    """Maps keys to shard indexes; adding a shard only moves ~1/N of the keys"""
+
+    def __init__(self, shard_count, replicas=RING_REPLICAS):
+        self.shard_count = shard_count
+        self.points = sorted(
+            (ring_point(f"shard-{shard}-{replica}"), shard)
+            for shard in range(shard_count)
+            for replica in range(replicas)
+        )
+        self.keys = [point for point, _ in self.points]
+
+    def owner(self, key):
+        i = bisect.bisect(self.keys, ring_point(key)) % len(self.keys)
+        return self.points[i][1]
+
+ring = HashRing(SHARD_COUNT)
+
+def owns_room(room_id):
+    return SHARD_COUNT == 1 or ring.owner(room_id) == SHARD_INDEX
+
+def new_room_id():
+    """Random room id that hashes to this process (about SHARD_COUNT tries)"""
+    while True:
+        room_id = str(uuid.uuid4())[:8]
+        if owns_room(room_id):
+            return room_id
@@ -0,0 +1,36 @@
+"""WebRTC signaling helpers"""
+import os
+
+from flask import request
+
+from .extensions import socketio
+from .metrics import tracked_lock
+from .rooms import game_rooms, player_rooms, players
+
+# Trickle ICE candidates are held for CANDIDATE_BATCH_WINDOW and relayed to
+# the peer as a single webrtc_candidates frame
+CANDIDATE_BATCH_WINDOW = float(os.environ.get("CANDIDATE_BATCH_WINDOW", 0.05))  # seconds
+
+pending_candidates = {}  # (peer sid, sender player_id) -> [candidate, ...]
+candidate_lock = tracked_lock("candidate")
+
+def flush_candidates():
+    with candidate_lock:
+        pending = dict(pending_candidates)
+        pending_candidates.clear()
+
+    for (peer_sid, player_id), candidates in pending.items():
+        socketio.emit("webrtc_candidates", {
+            "player_id": player_id,
+            "candidates": candidates
+        }, room=peer_sid)
+
+def signaling_peer_sid(player_id, room_id):
+    """Peer's sid if the caller is really seated in room_id, else None"""
+    player_info = players.get(player_id)
+    if player_info is None or player_info["sid"] != request.sid or player_rooms.get(player_id) != room_id:
+        return None
+
+    room = game_rooms.get(room_id)
+    peer = room.peer_of(player_id) if room else None
+    return peer["sid"] if peer else None
@@ -0,0 +1,105 @@
+"""Periodic gzip JSON snapshots of rooms and players for warm restarts"""
+import gzip
+import json
+import logging
+import os
+import time
+
+from .metrics import tracked_lock
+from .rooms import GameRoom, game_rooms, players, register_room
+
+logger = logging.getLogger(__name__)
+
+# State snapshots for warm restarts
+SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH", "state_snapshot.json.gz")
+SNAPSHOT_INTERVAL = int(os.environ.get("SNAPSHOT_INTERVAL", 30))  # seconds, 0 disables
+SNAPSHOT_RESUME_WINDOW = int(os.environ.get("SNAPSHOT_RESUME_WINDOW", 300))
+
+snapshot_lock = tracked_lock("snapshot")
+snapshot_cache = {}  # room_id -> ((last_activity, moves), encoded room)
+last_snapshot_body = None
+
+def save_snapshot():
+    """Serialize rooms and players to SNAPSHOT_PATH.
+
+    The registries are copied shallowly up front so handlers are never blocked
+    while encoding. Rooms whose activity stamp is unchanged reuse their cached
+    encoding, and the file is left alone when nothing changed at all.
+    """
+    global last_snapshot_body
+    with snapshot_lock:
+        rooms = list(game_rooms.values())
+        player_items = list(players.items())
+
+        fragments = []
+        fresh_cache = {}
+        for room in rooms:
+            key = (room.last_activity, room.game_state["moves"], room.p2p)
+            cached = snapshot_cache.get(room.room_id)
+            if cached is None or cached[0] != key:
+                cached = (key, json.dumps(room.to_dict(), separators=(",", ":")))
+            fresh_cache[room.room_id] = cached
+            fragments.append(cached[1])
+        snapshot_cache.clear()
+        snapshot_cache.update(fresh_cache)
+
+        players_data = {
+            pid: {
+                "name": info["name"],
+                "connected_at": info.get("connected_at"),
+                "session_token": info.get("session_token")
+            }
+            for pid, info in player_items
+        }
+        body = '"players":%s,"rooms":[%s]' % (
+            json.dumps(players_data, separators=(",", ":")), ",".join(fragments)
+        )
+        if body == last_snapshot_body:
+            return False
+
+        tmp_path = SNAPSHOT_PATH + ".tmp"
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                f.write('{"version":1,"saved_at":%r,%s}' % (time.time(), body))
+            os.replace(tmp_path, SNAPSHOT_PATH)
+        except OSError as e:
+            logger.error(f"Failed to write snapshot {SNAPSHOT_PATH}: {e}")
+            return False
+
+        last_snapshot_body = body
+        logger.info(f"Snapshot saved: {len(rooms)} rooms, {len(player_items)} players")
+        return True
+
+def load_snapshot():
+    """Restore rooms and players from SNAPSHOT_PATH.
+
+    Restored players have no socket until they register again with the same
+    player_id, at which point they are rebound and rejoined to their room.
+    """
+    if not os.path.exists(SNAPSHOT_PATH):
+        return 0
+
+    try:
+        with gzip.open(SNAPSHOT_PATH, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load snapshot {SNAPSHOT_PATH}: {e}")
+        return 0
+
+    now = time.time()
+    for pid, info in data["players"].items():
+        players[pid] = {
+            "name": info["name"],
+            "sid": None,
+            "session_token": info.get("session_token"),
+            "connected_at": info["connected_at"],
+            "resume_deadline": now + SNAPSHOT_RESUME_WINDOW
+        }
+
+    for room_data in data["rooms"]:
+        room = GameRoom.from_dict(room_data, players)
+        if not room.is_empty():
+            register_room(room)
+
+    logger.info(f"Snapshot loaded: {len(game_rooms)} rooms, {len(players)} players")
+    return len(game_rooms)
@@ -0,0 +1,167 @@
+"""Single-elimination tournaments played out in ordinary game rooms"""
+import logging
+import time
+
+from .extensions import socketio
+from .lobby import queue_spectator_update, spectator_channel
+from .metrics import tracked_lock
+from .rooms import (
+    GameRoom, game_rooms, player_rooms, players, register_room, remove_room, waiting_players
+)
+from .sharding import new_room_id
+
+logger = logging.getLogger(__name__)
+
+# Tournaments: rounds are created in bulk and advanced from game results.
+# tournament_rooms maps each bracket game back to its tournament so results
+# never require scanning game_rooms.
+tournaments = {}
+tournament_rooms = {}  # room_id -> Tournament
+
+class Tournament:
+    def __init__(self, tournament_id, name, player_ids):
+        self.tournament_id = tournament_id
+        self.name = name
+        self.entrants = list(player_ids)
+        self.round = 0
+        self.matches = {}  # room_id -> {"players": [a, b], "winner": None, "replays": 0}
+        self.pending = 0
+        self.advancing = []
+        self.champion = None
+        self.created_at = time.time()
+        self.lock = tracked_lock("tournament")
+        self.status_cache = None
+
+    def status(self):
+        """Round progress, rebuilt only after the bracket changes"""
+        if self.status_cache is None:
+            self.status_cache = {
+                "tournament_id": self.tournament_id,
+                "name": self.name,
+                "entrants": len(self.entrants),
+                "round": self.round,
+                "matches": len(self.matches),
+                "matches_pending": self.pending,
+                "replays": sum(match["replays"] for match in self.matches.values()),
+                "advancing": len(self.advancing),
+                "champion": self.champion,
+                "finished": self.champion is not None
+            }
+        return self.status_cache
+
+def start_tournament_round(tournament, contenders):
+    """Pair up contenders and open one started GameRoom per match"""
+    # Winners who disconnected or sat down in another room meanwhile drop out
+    contenders = [pid for pid in contenders if pid in players and pid not in player_rooms]
+    tournament.status_cache = None
+
+    if len(contenders) <= 1:
+        tournament.champion = contenders[0] if contenders else None
+        logger.info(f"Tournament {tournament.tournament_id} won by {tournament.champion}")
+        return
+
+    tournament.round += 1
+    tournament.matches = {}
+    tournament.advancing = []
+
+    if len(contenders) % 2:
+        tournament.advancing.append(contenders.pop())  # Bye
+
+    for player_a, player_b in zip(contenders[0::2], contenders[1::2]):
+        room = open_tournament_room(tournament, player_a, player_b)
+        tournament.matches[room.room_id] = {"players": [player_a, player_b], "winner": None, "replays": 0}
+    tournament.pending = len(tournament.matches)
+
+    logger.info(f"Tournament {tournament.tournament_id} round {tournament.round}: "
+                f"{tournament.pending} matches")
+
+def open_tournament_room(tournament, player_a, player_b):
+    room_id = new_room_id()
+    room = GameRoom(room_id)
+    for pid in (player_a, player_b):
+        room.add_player(pid, players[pid])
+        if pid in waiting_players:
+            waiting_players.remove(pid)
+    register_room(room)
+    tournament_rooms[room_id] = tournament
+
+    for pid in (player_a, player_b):
+        sid = players[pid]["sid"]
+        if sid is not None:
+            socketio.server.enter_room(sid, room_id, namespace="/")
+            socketio.emit("room_joined", dict(
+                room.snapshot(),
+                room_name=f"{tournament.name} - Round {tournament.round}"
+            ), room=sid)
+
+    start_tournament_game(room)
+    return room
+
+def start_tournament_game(room):
+    room.start_game()
+    for pid in room.get_player_list():
+        sid = room.players[pid]["sid"]
+        if sid is not None:
+            socketio.emit("game_started", room.start_payload(pid), room=sid)
+
+def record_tournament_result(room_id, winner):
+    """Advance the bracket once the game in a tournament room has ended"""
+    tournament = tournament_rooms.get(room_id)
+    if tournament is None:
+        return
+
+    if winner == "tie":
+        # Draws are replayed in the same room until someone wins
+        room = game_rooms[room_id]
+        with tournament.lock:
+            tournament.matches[room_id]["replays"] += 1
+            tournament.status_cache = None
+        room.reset_game()
+        socketio.emit("game_reset", {
+            "room_id": room_id,
+            "board": room.game_state["board"],
+            "game_active": room.game_state["game_active"]
+        }, room=room_id)
+        start_tournament_game(room)
+        queue_spectator_update(room)
+        return
+
+    player_a, player_b = tournament.matches[room_id]["players"]
+    finish_tournament_match(tournament, room_id, player_a if winner == 'X' else player_b)
+
+def forfeit_tournament_match(room_id, player_id):
+    """Award the match to the opponent of a player who left a tournament room"""
+    tournament = tournament_rooms.get(room_id)
+    if tournament is None:
+        return
+
+    player_a, player_b = tournament.matches[room_id]["players"]
+    if player_id not in (player_a, player_b):
+        return  # Only an entrant can forfeit
+    finish_tournament_match(tournament, room_id, player_b if player_id == player_a else player_a)
+
+def finish_tournament_match(tournament, room_id, winner_id):
+    with tournament.lock:
+        if tournament_rooms.pop(room_id, None) is None:
+            return  # Already settled
+        tournament.matches[room_id]["winner"] = winner_id
+        tournament.advancing.append(winner_id)
+        tournament.pending -= 1
+        tournament.status_cache = None
+        round_over = tournament.pending == 0
+
+    if remove_room(room_id) is not None:
+        socketio.close_room(room_id)
+    result = {
+        "tournament_id": tournament.tournament_id,
+        "round": tournament.round,
+        "winner": winner_id
+    }
+    socketio.emit("tournament_result", result, room=spectator_channel(room_id))
+    for pid in tournament.matches[room_id]["players"]:
+        sid = players.get(pid, {}).get("sid")
+        if sid is not None:
+            socketio.emit("tournament_result", dict(result, advanced=pid == winner_id), room=sid)
+
+    if round_over:
+        start_tournament_round(tournament, list(tournament.advancing))